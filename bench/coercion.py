@@ -0,0 +1,118 @@
+"""Measure manifest coercion throughput (records per second).
+
+  python bench/coercion.py [--seconds S] [--rounds N]
+
+Each raw record is coerced three ways:
+
+  uncompiled  each field through its (nested) Manifest.KINDS wrapper
+  compiled    the flattened record coercer (see compile_record())
+  Manifest    Manifest(**raw), which uses the compiled coercer
+
+Note that validator() resolves its kind once either way, so
+"uncompiled" only measures the wrapper layers.
+"""
+import argparse
+import os.path
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vscode.extension.manifest import Manifest
+
+
+def small_record():
+    return {
+            'name': 'small',
+            'publisher': 'someone',
+            'version': '1.2.3',
+            'engines': {'vscode': '^1.50.0'},
+            'scripts': {f'script{i}': f'node build.js --step {i}'
+                        for i in range(20)},
+            'contributors': [
+                {'name': 'Some One', 'email': 'someone@example.com'},
+                {'name': 'Other One', 'url': 'https://example.com'},
+                ],
+            }
+
+
+def big_record():
+    raw = small_record()
+    raw['name'] = 'big'
+    raw['keywords'] = ['a', 'b', 'c']
+    raw['categories'] = ['Other']
+    raw['activationEvents'] = [f'onCommand:big.cmd{i}' for i in range(50)]
+    raw['contributes'] = {
+            'commands': [{'command': f'big.cmd{i}', 'title': f'Thing {i}'}
+                         for i in range(50)],
+            }
+    raw['dependencies'] = {f'dep{i}': f'^{i}.0.0' for i in range(100)}
+    raw['devDependencies'] = {f'devdep{i}': f'~{i}.1.0' for i in range(100)}
+    return raw
+
+
+def coerce_uncompiled(raw, *, _kinds=Manifest.KINDS):
+    # This is what Manifest did before the kinds were compiled.
+    values = {}
+    for field, value in raw.items():
+        coerce = _kinds.get(field)
+        if coerce is not None:
+            value = coerce(value)
+        values[field] = value
+    return values
+
+
+def records_per_second(func, raw, seconds):
+    func(raw)  # warm up (and compile)
+    count = 0
+    start = time.perf_counter()
+    end = start + seconds
+    while True:
+        for _ in range(100):
+            func(raw)
+        count += 100
+        now = time.perf_counter()
+        if now >= end:
+            return count / (now - start)
+
+
+def parse_args(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(prog='bench/coercion.py')
+    parser.add_argument('--seconds', type=float, default=2.0,
+                        help='per measurement (default: 2)')
+    parser.add_argument('--rounds', type=int, default=5)
+    return parser.parse_args(argv)
+
+
+def main(seconds=2.0, rounds=5):
+    ways = [('uncompiled', coerce_uncompiled)]
+    # This lets the benchmark also run against older trees.
+    if hasattr(Manifest, '_compiled'):
+        coerce_compiled, _, _ = Manifest._compiled()
+        ways.append(('compiled', coerce_compiled))
+    ways.append(('Manifest', (lambda raw: Manifest(**raw))))
+    for label, raw in [('small', small_record()), ('big', big_record())]:
+        # The ways take turns, and the best round counts, to keep noise
+        # (e.g. from other processes) out of the comparison.
+        try:
+            for _, func in ways:
+                func(raw)
+        except Exception as exc:
+            # Older trees can't coerce some of the fields.
+            print(f'{label:6} (not supported: {type(exc).__name__}: {exc})')
+            continue
+        rates = {way: 0 for way, _ in ways}
+        for _ in range(rounds):
+            for way, func in ways:
+                rate = records_per_second(func, raw, seconds / rounds)
+                rates[way] = max(rates[way], rate)
+        baseline = rates['uncompiled']
+        for way, rate in rates.items():
+            print(f'{label:6} {way:11} {rate:>10,.0f} records/s  '
+                  f'({rate / baseline:4.2f}x)')
+    return 0
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    sys.exit(main(**vars(args)))
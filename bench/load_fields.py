@@ -0,0 +1,89 @@
+"""Compare util.load_json_fields() with json.loads() on a large manifest.
+
+  python bench/load_fields.py [--commands N]
+
+The selective load must never be slower than decoding everything, so
+this exits with 1 if it is (for any of the checked cases).  The last
+case has so many nested "name" keys that load_fields() gives up looking
+for a top-level duplicate and decodes the rest, so it is only reported.
+"""
+import argparse
+import json
+import os.path
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vscode import util
+
+
+def make_manifest(numcommands, *, nested=0):
+    """Return the JSON text for a manifest with many commands.
+
+    "nested" is how many of the views reuse the "name" key (so a search
+    for "name" has that many nested matches to rule out).
+    """
+    data = {
+            'name': 'big',
+            'publisher': 'someone',
+            'version': '1.0.0',
+            'engines': {'vscode': '^1.50.0'},
+            'contributes': {
+                'commands': [{'command': f'big.cmd{i}',
+                              'title': f'Do thing {i} [{{x}}]',
+                              'category': 'Big'}
+                             for i in range(numcommands)],
+                'views': {'explorer': [{'id': f'big.view{i}',
+                                        'name': f'View {i}'}
+                                       for i in range(nested)]},
+                },
+            'author': {'name': 'Some One', 'email': 'someone@example.com'},
+            }
+    return json.dumps(data, indent=4)
+
+
+def best(func, *, number=5, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def parse_args(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(prog='bench/load_fields.py')
+    parser.add_argument('--commands', type=int, default=20_000)
+    return parser.parse_args(argv)
+
+
+def main(commands=20_000):
+    identity = ['name', 'publisher', 'version', 'engines']
+    cases = [
+            # (label, text, fields, checked)
+            ('identity', make_manifest(commands), identity, True),
+            ('name', make_manifest(commands), ['name'], True),
+            ('name, nested',
+             make_manifest(commands, nested=commands // 200), ['name'], True),
+            ('name, fallback',
+             make_manifest(commands, nested=commands // 4), ['name'], False),
+            ]
+    failed = False
+    for label, text, fields, checked in cases:
+        assert util.load_json_fields(text, fields) == {
+                f: v for f, v in json.loads(text).items() if f in fields}
+        full = best(lambda: json.loads(text))
+        selective = best(lambda: util.load_json_fields(text, fields))
+        if selective <= full:
+            status = 'ok'
+        elif checked:
+            status = 'SLOWER'
+            failed = True
+        else:
+            status = 'slower (not checked)'
+        print(f'{label:15} {len(text):>10,} bytes  '
+              f'json.loads {full * 1000:8.3f} ms  '
+              f'load_fields {selective * 1000:8.3f} ms  '
+              f'{status}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    sys.exit(main(**vars(args)))
@@ -0,0 +1,81 @@
+"""Check that memory stays flat over millions of version parses.
+
+  python bench/memory.py [--count N] [--batch N] [--max-growth MB]
+
+Every parsed SemVer keeps its labels, metadata and raw text in
+pseudo-slots (see classtools.Slot).  Those used to be kept on the
+descriptor, keyed by id(), so they outlived the objects.  This parses
+"count" versions in batches (each batch is held, like an index would,
+and then dropped) and reports the process RSS after each batch is
+dropped.  It exits with 1 if that grew by more than "max-growth" MB
+over the RSS from before parsing anything.
+"""
+import argparse
+import gc
+import os
+import os.path
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vscode import util
+
+
+def get_rss():
+    """Return the current resident set size of the process, in bytes."""
+    try:
+        with open('/proc/self/statm') as infile:
+            pages = int(infile.read().split()[1])
+    except OSError:
+        # This is the peak RSS (KB on Linux, bytes on macOS), which
+        # still shows any growth.
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == 'darwin' else maxrss * 1024
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def parse_batch(start, stop):
+    versions = []
+    for i in range(start, stop):
+        version = util.SemVer.parse(f'1.{i % 1000}.{i}-alpha.{i}+build.{i}')
+        # Make sure the pseudo-slots actually get used.
+        str(version)
+        versions.append(version)
+    return versions
+
+
+def parse_args(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(prog='bench/memory.py')
+    parser.add_argument('--count', type=int, default=2_000_000)
+    parser.add_argument('--batch', type=int, default=200_000)
+    parser.add_argument('--max-growth', dest='maxgrowth', type=float,
+                        default=10.0, help='in MB (default: 10)')
+    return parser.parse_args(argv)
+
+
+def main(count=2_000_000, batch=200_000, maxgrowth=10.0):
+    gc.collect()
+    baseline = get_rss()
+    print(f'{0:>12,} parsed  rss {baseline / 2**20:8.1f} MB')
+    start = time.perf_counter()
+    for done in range(0, count, batch):
+        versions = parse_batch(done, min(done + batch, count))
+        # We don't read the RSS while the batch is still held, since
+        # that would itself leave the heap fragmented.
+        del versions
+        gc.collect()
+        rss = get_rss()
+        elapsed = time.perf_counter() - start
+        print(f'{min(done + batch, count):>12,} parsed  '
+              f'rss {rss / 2**20:8.1f} MB  '
+              f'({elapsed:6.1f} s)')
+    growth = (rss - baseline) / 2**20
+    print(f'growth: {growth:.1f} MB')
+    return 1 if growth > maxgrowth else 0
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    sys.exit(main(**vars(args)))
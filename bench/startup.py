@@ -0,0 +1,93 @@
+"""Measure CLI startup time.
+
+  python bench/startup.py [--runs N] [ARG ...]
+
+This runs "vscode-extension-project.py --help" (or the given args) in a
+fresh interpreter "runs" times and reports the wall time, along with
+how long the vscode.* imports took (from "python -X importtime").
+"""
+import argparse
+import os.path
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'vscode-extension-project.py')
+
+
+def run(args, *, importtime=False):
+    """Return (wall time, stderr) for running the script once."""
+    argv = [sys.executable]
+    if importtime:
+        argv.extend(['-X', 'importtime'])
+    argv.extend([SCRIPT, *args])
+    start = time.perf_counter()
+    proc = subprocess.run(argv, cwd=ROOT,
+                          stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE,
+                          text=True,
+                          )
+    elapsed = time.perf_counter() - start
+    return elapsed, proc.stderr
+
+
+def parse_importtime(text):
+    """Return (total, {module: self time}) for the vscode.* imports.
+
+    The total is the cumulative time of the top-level vscode.* imports,
+    which includes anything they import (e.g. from the stdlib).  The
+    times are in microseconds.
+    """
+    total = 0
+    times = {}
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        selftime, cumulative, name = line[len('import time:'):].split('|')
+        if name.strip().split('.')[0] != 'vscode':
+            continue
+        times[name.strip()] = int(selftime)
+        # Nested imports are indented further.
+        if not name[1:].startswith(' '):
+            total += int(cumulative)
+    return total, times
+
+
+def parse_args(argv=sys.argv[1:]):
+    parser = argparse.ArgumentParser(prog='bench/startup.py')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('args', nargs='*')
+    return parser.parse_args(argv)
+
+
+def main(args=(), runs=20):
+    args = list(args) or ['--help']
+    # Warm up the OS caches (and __pycache__).
+    run(args)
+
+    walls = [run(args)[0] for _ in range(runs)]
+    imports = []
+    modules = None
+    for _ in range(runs):
+        _, stderr = run(args, importtime=True)
+        total, modules = parse_importtime(stderr)
+        imports.append(total)
+
+    print(f'command: vscode-extension-project.py {" ".join(args)}')
+    print(f'wall time:      median {statistics.median(walls) * 1000:7.1f} ms  '
+          f'min {min(walls) * 1000:7.1f} ms  ({runs} runs)')
+    print(f'vscode imports: median {statistics.median(imports) / 1000:7.1f} ms  '
+          f'min {min(imports) / 1000:7.1f} ms  '
+          f'({len(modules)} modules)')
+    print('slowest vscode modules (self time, last run):')
+    for name, usec in sorted(modules.items(), key=lambda v: -v[1])[:5]:
+        print(f'  {usec / 1000:7.1f} ms  {name}')
+    return 0
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    sys.exit(main(**vars(args)))
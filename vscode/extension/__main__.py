@@ -0,0 +1,120 @@
+import logging
+import os.path
+import sys
+
+
+logger = logging.getLogger(__name__)
+
+
+#######################################
+# commands
+
+def cmd_scan(root, *,
+             fields=None,
+             workers=None,
+             processes=False,
+             _scan_all=None,
+             _print=print,
+             ):
+    if _scan_all is None:
+        from .scan import scan_all as _scan_all
+    from vscode.util.scriptutil import format_table
+    logger.info(f'scanning the extensions in {root} ...')
+    if fields is None:
+        from .scan import IDENTITY as fields
+    results, failures = _scan_all(root, fields,
+                                  workers=workers,
+                                  processes=processes,
+                                  )
+
+    cols = {'extension': 40, 'version': 12, 'directory': 50}
+    rows = ((r.id, r.manifest.version or '', os.path.basename(r.dirname))
+            for r in results)
+    for line in format_table(rows, cols):
+        _print(line)
+    if failures:
+        _print('')
+        _print(f'failures ({len(failures)}):')
+        for result in failures:
+            _print(f'  {os.path.basename(result.dirname)}: {result.error}')
+
+
+COMMANDS = {
+    'scan': cmd_scan,
+}
+
+
+#######################################
+# the script
+
+def parse_args(prog=sys.argv[0], argv=sys.argv[1:]):
+    import argparse
+    from vscode.util.scriptutil import (
+        add_verbosity_cli,
+        add_logging_cli,
+        add_traceback_cli,
+    )
+
+    common = argparse.ArgumentParser(add_help=False)
+    process_verbosity = add_verbosity_cli(common)
+    process_logging = add_logging_cli(common)
+    process_tb = add_traceback_cli(common)
+
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        parents=[common],
+    )
+    subs = parser.add_subparsers(dest='cmd')
+
+    sub_scan = subs.add_parser('scan',
+                               parents=[common],
+                               description='List the extensions installed in the given directory (e.g. ~/.vscode/extensions)',
+                               )
+    sub_scan.add_argument('--fields', type=(lambda v: v.replace(',', ' ').split()),
+                          help='the manifest fields to load (default: name, publisher, version, engines)')
+    sub_scan.add_argument('--workers', type=int)
+    sub_scan.add_argument('--processes', action='store_true',
+                          help='read the manifests in processes instead of threads')
+    sub_scan.add_argument('root')
+
+    args = parser.parse_args(argv)
+    ns = vars(args)
+
+    verbosity = process_verbosity(args)
+    logfile = process_logging(args)
+    traceback_cm = process_tb(args)
+
+    cmd = ns.pop('cmd')
+    if not cmd:
+        parser.error('missing command')
+
+    if cmd == 'scan':
+        args.root = os.path.expanduser(args.root)
+        if args.fields is not None:
+            for field in ('name', 'publisher', 'version'):
+                if field not in args.fields:
+                    args.fields.append(field)
+
+    return cmd, ns, verbosity, logfile, traceback_cm
+
+
+def main(cmd, *,
+         _commands=COMMANDS,
+         **kwargs
+         ):
+    if not cmd:
+        raise TypeError('missing cmd')
+    try:
+        run_cmd = _commands[cmd]
+    except KeyError:
+        raise ValueError(f'unsupported cmd {cmd!r}')
+
+    run_cmd(**kwargs)
+
+
+if __name__ == '__main__':
+    from vscode.util.scriptutil import configure_logger
+    cmd, kwargs, verbosity, logfile, traceback_cm = parse_args()
+    configure_logger(logger, verbosity, logfile=logfile)
+    with traceback_cm:
+        main(cmd, **kwargs)
@@ -0,0 +1,173 @@
+import re
+
+
+STARTUP = '*'
+WORKSPACE_CONTAINS = 'workspaceContains:'
+
+
+def _glob_to_regex(pattern):
+    # VS Code globs: "**" spans directories, "*" and "?" do not.
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            regex.append('(?:.*/)?')
+            i += 3
+            continue
+        elif pattern.startswith('**', i):
+            regex.append('.*')
+            i += 2
+            continue
+        elif char == '*':
+            regex.append('[^/]*')
+        elif char == '?':
+            regex.append('[^/]')
+        elif char == '{':
+            end = pattern.find('}', i)
+            if end < 0:
+                regex.append(re.escape(char))
+            else:
+                alts = pattern[i+1:end].split(',')
+                regex.append('(?:' + '|'.join(_glob_to_regex(a)
+                                              for a in alts) + ')')
+                i = end + 1
+                continue
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end < 0:
+                regex.append(re.escape(char))
+            else:
+                body = pattern[i+1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex.append(f'[{body}]')
+                i = end + 1
+                continue
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return ''.join(regex)
+
+
+class ActivationTable:
+    """A lookup table of which extensions activate on which events.
+
+    Exact events (e.g. "onLanguage:python") are looked up in a dict.
+    All "workspaceContains:" globs are compiled into one regex, so each
+    workspace file is matched against all of them in a single pass.
+    """
+
+    def __init__(self):
+        self._exact = {}  # {event: {extid}}
+        self._startup = set()  # extensions with "*"
+        self._globs = {}  # {glob: {extid}}
+        self._events = {}  # {extid: events}
+        self._matcher = None  # (regex, [glob])
+
+    @classmethod
+    def from_manifests(cls, manifests):
+        """Return a table for the given manifests."""
+        self = cls()
+        for manifest in manifests:
+            self.add_manifest(manifest)
+        return self
+
+    def __repr__(self):
+        return f'<{type(self).__name__} ({len(self._events)} extensions)>'
+
+    def __len__(self):
+        return len(self._events)
+
+    def __contains__(self, extid):
+        return extid in self._events
+
+    def add_manifest(self, manifest):
+        extid = f'{manifest.publisher}.{manifest.name}'
+        self.add(extid, manifest.activationEvents or ())
+
+    def add(self, extid, events):
+        """Add (or replace) the activation events for the extension."""
+        if extid in self._events:
+            self.remove(extid)
+        events = tuple(events)
+        self._events[extid] = events
+        for event in events:
+            if event == STARTUP:
+                self._startup.add(extid)
+                continue
+            self._exact.setdefault(event, set()).add(extid)
+            if event.startswith(WORKSPACE_CONTAINS):
+                glob = event[len(WORKSPACE_CONTAINS):]
+                if glob not in self._globs:
+                    self._matcher = None
+                self._globs.setdefault(glob, set()).add(extid)
+
+    def remove(self, extid):
+        """Drop the extension from the table."""
+        events = self._events.pop(extid)
+        for event in events:
+            if event == STARTUP:
+                self._startup.discard(extid)
+                continue
+            _discard(self._exact, event, extid)
+            if event.startswith(WORKSPACE_CONTAINS):
+                glob = event[len(WORKSPACE_CONTAINS):]
+                if _discard(self._globs, glob, extid):
+                    self._matcher = None
+
+    def lookup(self, event, *, startup=True):
+        """Return the IDs of the extensions that activate on the event.
+
+        Extensions that activate on startup ("*") are included unless
+        "startup" is false.
+        """
+        found = set(self._exact.get(event, ()))
+        if startup:
+            found |= self._startup
+        return found
+
+    def startup(self):
+        """Return the IDs of the extensions that activate on startup."""
+        return set(self._startup)
+
+    def for_workspace(self, filenames, *, startup=True):
+        """Return the IDs activated by "workspaceContains" for the files.
+
+        The filenames are relative to the workspace root and use "/".
+        """
+        found = set(self._startup) if startup else set()
+        if not self._globs:
+            return found
+        regex, globs = self._get_matcher()
+        remaining = set(range(len(globs)))
+        for filename in filenames:
+            matched = regex.match(filename).groups()
+            for index, group in enumerate(matched):
+                if group is not None and index in remaining:
+                    found |= self._globs[globs[index]]
+                    remaining.discard(index)
+            if not remaining:
+                break
+        return found
+
+    def _get_matcher(self):
+        if self._matcher is None:
+            globs = sorted(self._globs)
+            # Each glob is an optional lookahead with its own group, so
+            # one match reports every glob that matches the filename.
+            regex = ''.join(f'(?=({_glob_to_regex(g)})\\Z)?' for g in globs)
+            self._matcher = (re.compile(regex, re.DOTALL), globs)
+        return self._matcher
+
+
+def _discard(table, key, extid):
+    # Return True if the key was removed.
+    ids = table.get(key)
+    if ids is None:
+        return False
+    ids.discard(extid)
+    if not ids:
+        del table[key]
+        return True
+    return False
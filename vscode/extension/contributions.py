@@ -0,0 +1,113 @@
+from .manifest import Keybinding
+
+
+class ContributionIndex:
+    """Lookup tables for what each extension contributes.
+
+    Commands, languages and keybinding chords are each mapped to the
+    extensions that contribute them, so lookups and conflict checks
+    across many extensions are dict lookups.
+    """
+
+    def __init__(self):
+        self._commands = {}  # {command: {extid}}
+        self._languages = {}  # {language: {extid}}
+        self._keybindings = {}  # {(platform, chord): {(extid, command, when)}}
+        self._contributions = {}  # {extid: Contributions}
+
+    @classmethod
+    def from_manifests(cls, manifests):
+        """Return the index for the given manifests."""
+        self = cls()
+        for manifest in manifests:
+            self.add_manifest(manifest)
+        return self
+
+    def __repr__(self):
+        return f'<{type(self).__name__} ({len(self._contributions)} extensions)>'
+
+    def __len__(self):
+        return len(self._contributions)
+
+    def __contains__(self, extid):
+        return extid in self._contributions
+
+    def add_manifest(self, manifest):
+        extid = f'{manifest.publisher}.{manifest.name}'
+        if manifest.contributes:
+            self.add(extid, manifest.contributes)
+
+    def add(self, extid, contributions):
+        """Add (or replace) what the extension contributes."""
+        if extid in self._contributions:
+            self.remove(extid)
+        self._contributions[extid] = contributions
+        for key, table, value in self._iter_entries(extid, contributions):
+            table.setdefault(key, set()).add(value)
+
+    def remove(self, extid):
+        """Drop the extension from the index."""
+        contributions = self._contributions.pop(extid)
+        for key, table, value in self._iter_entries(extid, contributions):
+            entries = table.get(key)
+            if entries is not None:
+                entries.discard(value)
+                if not entries:
+                    del table[key]
+
+    def _iter_entries(self, extid, contributions):
+        for command in contributions.commands:
+            yield command.command, self._commands, extid
+        for language in contributions.languages:
+            yield language.id, self._languages, extid
+        for binding in contributions.keybindings:
+            for platform, chord in binding.chords():
+                yield ((platform, chord), self._keybindings,
+                       (extid, binding.command, binding.when))
+
+    def get(self, extid):
+        """Return the extension's contributions (or None)."""
+        return self._contributions.get(extid)
+
+    def find_command(self, command):
+        """Return the IDs of the extensions that contribute the command."""
+        return set(self._commands.get(command, ()))
+
+    def find_language(self, language):
+        """Return the IDs of the extensions that contribute the language."""
+        return set(self._languages.get(language, ()))
+
+    def find_keybinding(self, key, platform=None):
+        """Return {(extid, command, when)} bound to the key sequence.
+
+        "platform" is one of "mac", "linux", "win" or None (the default
+        key).
+        """
+        chord = Keybinding.normalize_chord(key)
+        return set(self._keybindings.get((platform, chord), ()))
+
+    def iter_conflicts(self):
+        """Yield (kind, key, extids) for each conflicting contribution.
+
+        A command is a conflict if more than one extension contributes
+        it.  A keybinding is a conflict if more than one extension binds
+        the same chord (on the same platform) with the same "when".
+        """
+        for command, extids in sorted(self._commands.items()):
+            if len(extids) > 1:
+                yield 'command', command, sorted(extids)
+        for (platform, chord), entries in sorted(self._keybindings.items(),
+                                                 key=_keybinding_sort_key):
+            by_when = {}
+            for extid, _, when in entries:
+                by_when.setdefault(when, set()).add(extid)
+            for when, extids in sorted(by_when.items(),
+                                       key=(lambda i: i[0] or '')):
+                if len(extids) > 1:
+                    key = (platform, chord, when)
+                    yield 'keybinding', key, sorted(extids)
+
+
+def _keybinding_sort_key(item):
+    (platform, chord), _ = item
+    return (platform or '', chord)
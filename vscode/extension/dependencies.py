@@ -0,0 +1,220 @@
+import heapq
+
+
+class CycleError(ValueError):
+    """The extensions depend on each other in a cycle."""
+
+    def __init__(self, cycles):
+        self.cycles = cycles
+        groups = '; '.join(', '.join(cycle) for cycle in cycles)
+        super().__init__(f'dependency cycle(s) among: {groups}')
+
+
+class DependencyGraph:
+    """The dependencies between a set of extensions.
+
+    Both "extensionDependencies" and "extensionPack" are edges (with
+    packs=False only the former are followed).  Transitive closures are
+    memoized, and adding or removing an extension only invalidates the
+    closures of the extensions that (transitively) depend on it.
+    """
+
+    def __init__(self):
+        self._deps = {}  # {extid: (extid,)}
+        self._packs = {}  # {extid: (extid,)}
+        self._dependents = {}  # {extid: {extid}} (reverse of both)
+        self._closures = {True: {}, False: {}}
+
+    @classmethod
+    def from_manifests(cls, manifests):
+        """Return the graph for the given manifests."""
+        self = cls()
+        for manifest in manifests:
+            self.add_manifest(manifest)
+        return self
+
+    def __repr__(self):
+        return f'<{type(self).__name__} ({len(self._deps)} extensions)>'
+
+    def __len__(self):
+        return len(self._deps)
+
+    def __contains__(self, extid):
+        return extid in self._deps
+
+    def __iter__(self):
+        return iter(self._deps)
+
+    def add_manifest(self, manifest):
+        extid = f'{manifest.publisher}.{manifest.name}'
+        self.add(extid,
+                 manifest.extensionDependencies or (),
+                 manifest.extensionPack or ())
+
+    def add(self, extid, dependencies=(), pack=()):
+        """Add (or replace) the extension and its direct dependencies."""
+        if extid in self._deps:
+            self.remove(extid)
+        self._deps[extid] = tuple(dependencies)
+        self._packs[extid] = tuple(pack)
+        for dep in self._deps[extid] + self._packs[extid]:
+            self._dependents.setdefault(dep, set()).add(extid)
+        self._invalidate(extid)
+
+    def remove(self, extid):
+        """Drop the extension from the graph."""
+        self._invalidate(extid)
+        for dep in self._deps.pop(extid) + self._packs.pop(extid):
+            dependents = self._dependents.get(dep)
+            if dependents is not None:
+                dependents.discard(extid)
+                if not dependents:
+                    del self._dependents[dep]
+
+    def _invalidate(self, extid):
+        # Forget the closures of the extension and of everything that
+        # depends on it, directly or indirectly.
+        pending = [extid]
+        seen = {extid}
+        while pending:
+            current = pending.pop()
+            for closures in self._closures.values():
+                closures.pop(current, None)
+            for dependent in self._dependents.get(current, ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    pending.append(dependent)
+
+    def _direct(self, extid, packs):
+        deps = self._deps.get(extid, ())
+        if packs:
+            deps += self._packs.get(extid, ())
+        return deps
+
+    def dependencies(self, extid, *, packs=True):
+        """Return the direct dependencies of the extension."""
+        return self._direct(extid, packs)
+
+    def dependents(self, extid):
+        """Return the extensions that directly depend on the extension."""
+        return set(self._dependents.get(extid, ()))
+
+    def closure(self, extid, *, packs=True):
+        """Return every extension the given one depends on, transitively.
+
+        The result is memoized.  It may include extensions that are not
+        in the graph (see missing()).
+        """
+        closures = self._closures[packs]
+        try:
+            return closures[extid]
+        except KeyError:
+            pass
+        found = set()
+        pending = list(self._direct(extid, packs))
+        while pending:
+            dep = pending.pop()
+            if dep in found:
+                continue
+            found.add(dep)
+            known = closures.get(dep)
+            if known is not None:
+                found |= known
+            else:
+                pending.extend(self._direct(dep, packs))
+        found.discard(extid)
+        closure = closures[extid] = frozenset(found)
+        return closure
+
+    def missing(self):
+        """Return the dependencies that are not in the graph."""
+        return {dep for dep in self._dependents if dep not in self._deps}
+
+    def order(self, extids=None, *, packs=True):
+        """Return the extensions in dependency order (dependencies first).
+
+        If "extids" is provided then only those extensions and their
+        dependencies are included.  Ties are broken by name, so the
+        result is deterministic.  CycleError is raised for any cycles.
+        """
+        if extids is None:
+            nodes = set(self._deps)
+        else:
+            nodes = set()
+            for extid in extids:
+                nodes.add(extid)
+                nodes |= self.closure(extid, packs=packs)
+        nodes &= self._deps.keys()
+
+        remaining = {n: 0 for n in nodes}
+        dependents = {n: [] for n in nodes}
+        for node in nodes:
+            for dep in set(self._direct(node, packs)):
+                if dep in nodes:
+                    remaining[node] += 1
+                    dependents[dep].append(node)
+        ready = [n for n, count in remaining.items() if not count]
+        heapq.heapify(ready)
+        ordered = []
+        while ready:
+            node = heapq.heappop(ready)
+            ordered.append(node)
+            for dependent in dependents[node]:
+                remaining[dependent] -= 1
+                if not remaining[dependent]:
+                    heapq.heappush(ready, dependent)
+        if len(ordered) != len(nodes):
+            unresolved = nodes - set(ordered)
+            raise CycleError(self.find_cycles(unresolved, packs=packs))
+        return ordered
+
+    def find_cycles(self, extids=None, *, packs=True):
+        """Return each group of extensions that depend on each other.
+
+        Each group is a sorted list.  (This is Tarjan's algorithm.)
+        """
+        nodes = set(self._deps) if extids is None else set(extids)
+        index = {}
+        lowlink = {}
+        stack = []
+        onstack = set()
+        cycles = []
+        counter = 0
+        for root in sorted(nodes):
+            if root in index:
+                continue
+            work = [(root, iter(self._direct(root, packs)))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            onstack.add(root)
+            while work:
+                node, deps = work[-1]
+                for dep in deps:
+                    if dep not in nodes:
+                        continue
+                    if dep not in index:
+                        index[dep] = lowlink[dep] = counter
+                        counter += 1
+                        stack.append(dep)
+                        onstack.add(dep)
+                        work.append((dep, iter(self._direct(dep, packs))))
+                        break
+                    elif dep in onstack:
+                        lowlink[node] = min(lowlink[node], index[dep])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        group = []
+                        while True:
+                            member = stack.pop()
+                            onstack.discard(member)
+                            group.append(member)
+                            if member == node:
+                                break
+                        if len(group) > 1 or node in self._direct(node, packs):
+                            cycles.append(sorted(group))
+        return sorted(cycles)
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import os.path
+import sqlite3
+
+from vscode import util
+from .manifest import Manifest
+from .scan import MANIFEST, iter_extension_dirs
+
+
+FIELDS = (
+        'name',
+        'publisher',
+        'version',
+        'engines',
+        'categories',
+        'activationEvents',
+        )
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS extensions (
+    dirname TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    id TEXT,
+    name TEXT,
+    publisher TEXT,
+    version TEXT,
+    engine TEXT,
+    engine_min INTEGER,
+    engine_max INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS extensions_root ON extensions (root);
+CREATE INDEX IF NOT EXISTS extensions_id ON extensions (id);
+CREATE INDEX IF NOT EXISTS extensions_publisher ON extensions (publisher);
+CREATE INDEX IF NOT EXISTS extensions_engine
+    ON extensions (engine_min, engine_max);
+
+CREATE TABLE IF NOT EXISTS categories (
+    dirname TEXT NOT NULL REFERENCES extensions ON DELETE CASCADE,
+    category TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS categories_category ON categories (category);
+CREATE INDEX IF NOT EXISTS categories_dirname ON categories (dirname);
+
+CREATE TABLE IF NOT EXISTS activation_events (
+    dirname TEXT NOT NULL REFERENCES extensions ON DELETE CASCADE,
+    event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS activation_events_event
+    ON activation_events (event);
+CREATE INDEX IF NOT EXISTS activation_events_dirname
+    ON activation_events (dirname);
+'''
+
+COLUMNS = 'dirname, id, name, publisher, version, engine, error'
+
+
+@util.as_namedtuple(COLUMNS.split(', '))
+class IndexEntry:
+    """A single extension, as recorded in the index."""
+
+    __slots__ = ()
+
+
+@util.as_namedtuple('added updated unchanged removed')
+class RefreshStats:
+    """How many extensions a refresh touched."""
+
+    __slots__ = ()
+
+
+def _engine_bounds(spec):
+    # Return (min, max) as sortable ints covering every range in the
+    # spec (max is None if unbounded).  These are only used to narrow
+    # down candidates, so pre-release labels are ignored.
+    ranges = spec.ranges
+    if not ranges:
+        return None, None
+    (_, lokey), _ = ranges[0]
+    _, upper = ranges[-1]
+    engine_min = _version_int(*lokey[:3])
+    engine_max = _version_int(*upper[1][:3]) if upper else None
+    return engine_min, engine_max
+
+
+def _version_int(major, minor, micro):
+    return (major * 1_000_000 + minor) * 1_000_000 + micro
+
+
+class ExtensionIndex:
+    """A persistent (SQLite) index of installed extensions.
+
+    Use refresh() to bring it up to date with an extensions directory.
+    Only manifests that were added or changed since the last refresh
+    are read.
+    """
+
+    def __init__(self, filename, *,
+                 _connect=sqlite3.connect,
+                 ):
+        self.filename = filename
+        self._conn = _connect(filename)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        self._conn.executescript(SCHEMA)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.filename!r})'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def refresh(self, root, *,
+                _iter_dirs=iter_extension_dirs,
+                _stat=os.stat,
+                _read=(lambda f: _read_bytes(f)),
+                ):
+        """Update the index to match the extensions in the directory.
+
+        A manifest is only re-read if its mtime or size changed, and it
+        is only re-parsed if its content hash changed too.  Entries for
+        extensions that are gone are dropped.
+        """
+        root = os.path.abspath(root)
+        known = {dirname: (mtime_ns, size, hash)
+                 for dirname, mtime_ns, size, hash in self._conn.execute(
+                     'SELECT dirname, mtime_ns, size, hash FROM extensions '
+                     'WHERE root = ?', (root,))}
+        added = updated = unchanged = 0
+        seen = set()
+        with self._conn:
+            for dirname in _iter_dirs(root):
+                filename = os.path.join(dirname, MANIFEST)
+                try:
+                    st = _stat(filename)
+                except FileNotFoundError:
+                    continue
+                seen.add(dirname)
+                old = known.get(dirname)
+                if old and old[:2] == (st.st_mtime_ns, st.st_size):
+                    unchanged += 1
+                    continue
+                data = _read(filename)
+                digest = hashlib.sha256(data).hexdigest()
+                if old and old[2] == digest:
+                    self._conn.execute(
+                        'UPDATE extensions SET mtime_ns = ?, size = ? '
+                        'WHERE dirname = ?',
+                        (st.st_mtime_ns, st.st_size, dirname))
+                    unchanged += 1
+                    continue
+                self._store(root, dirname, st, digest, data)
+                if old:
+                    updated += 1
+                else:
+                    added += 1
+
+            removed = [d for d in known if d not in seen]
+            self._conn.executemany(
+                    'DELETE FROM extensions WHERE dirname = ?',
+                    ((d,) for d in removed))
+        return RefreshStats(added, updated, unchanged, len(removed))
+
+    def _store(self, root, dirname, st, digest, data):
+        manifest = error = None
+        try:
+            manifest = Manifest.from_data(json.loads(data), FIELDS)
+        except Exception as exc:
+            error = f'{type(exc).__name__}: {exc}'
+
+        conn = self._conn
+        conn.execute('DELETE FROM extensions WHERE dirname = ?', (dirname,))
+        if manifest is None:
+            conn.execute(
+                'INSERT INTO extensions '
+                '(dirname, root, mtime_ns, size, hash, error) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (dirname, root, st.st_mtime_ns, st.st_size, digest, error))
+            return
+
+        engine = (manifest.engines or {}).get('vscode')
+        engine_min, engine_max = _engine_bounds(engine) if engine else (None, None)
+        conn.execute(
+            'INSERT INTO extensions '
+            '(dirname, root, mtime_ns, size, hash, id, name, publisher, '
+            ' version, engine, engine_min, engine_max) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (dirname, root, st.st_mtime_ns, st.st_size, digest,
+             f'{manifest.publisher}.{manifest.name}',
+             manifest.name, manifest.publisher, str(manifest.version),
+             engine, engine_min, engine_max))
+        conn.executemany(
+            'INSERT INTO categories (dirname, category) VALUES (?, ?)',
+            ((dirname, c) for c in manifest.categories or ()))
+        conn.executemany(
+            'INSERT INTO activation_events (dirname, event) VALUES (?, ?)',
+            ((dirname, e) for e in manifest.activationEvents or ()))
+
+    #######################
+    # queries
+
+    def _select(self, where='', params=(), *, join=''):
+        sql = f'SELECT {", ".join("e." + c for c in COLUMNS.split(", "))} ' \
+              f'FROM extensions AS e {join} {where} ORDER BY e.dirname'
+        return [IndexEntry(*row) for row in self._conn.execute(sql, params)]
+
+    def get(self, dirname):
+        """Return the entry for the given extension directory (or None)."""
+        entries = self._select('WHERE e.dirname = ?',
+                               (os.path.abspath(dirname),))
+        return entries[0] if entries else None
+
+    def all(self, *, errors=False):
+        """Return every entry (only the failed ones if "errors" is true)."""
+        if errors:
+            return self._select('WHERE e.error IS NOT NULL')
+        return self._select('WHERE e.error IS NULL')
+
+    def by_id(self, extid):
+        return self._select('WHERE e.id = ?', (extid,))
+
+    def by_publisher(self, publisher):
+        return self._select('WHERE e.publisher = ?', (publisher,))
+
+    def by_category(self, category):
+        return self._select('WHERE c.category = ?', (category,),
+                            join='JOIN categories AS c USING (dirname)')
+
+    def by_activation_event(self, event):
+        return self._select('WHERE a.event = ?', (event,),
+                            join='JOIN activation_events AS a USING (dirname)')
+
+    def compatible_with(self, vscode):
+        """Return the entries whose engine matches the VS Code version(s).
+
+        "vscode" may be a version or a spec (e.g. "^1.40.0").
+        """
+        spec = util.VersionSpec.parse(str(vscode))
+        low, high = _engine_bounds(spec)
+        if low is None:
+            return []
+        # First narrow it down using the indexed bounds.
+        where = 'WHERE e.engine IS NOT NULL'
+        params = []
+        if high is not None:
+            where += ' AND e.engine_min <= ?'
+            params.append(high)
+        where += ' AND (e.engine_max IS NULL OR e.engine_max >= ?)'
+        params.append(low)
+        candidates = self._select(where, params)
+        return [entry for entry in candidates
+                if not spec.intersect(entry.engine).is_empty]
+
+
+def _read_bytes(filename):
+    with open(filename, 'rb') as infile:
+        return infile.read()
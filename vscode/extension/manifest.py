@@ -1,46 +1,186 @@
 from collections.abc import Mapping
+import json
 import os
+import types
 
 from .. import util
 
 
 validator = util.validator
+Diagnostic = util.Diagnostic
 
 
 def kind(wrapped):
     def wrapper(raw):
         return wrapped(raw)
+    wrapper.spec = ('kind', wrapped)
     return wrapper
 
 
-def mapping(key, value):
+def mapping(key, value, *, lazy=False):
     def wrapper(raw):
-        return util.as_readonly_mapping(raw, key=key, value=value)
+        return util.as_readonly_mapping(raw, key=key, value=value, lazy=lazy)
+    wrapper.spec = ('mapping', key, value, lazy)
     return wrapper
 
 
-def array(item, *, max=None):
+def array(item, *, max=None, lazy=False):
     if max is None:
         max = -1;
 
     if max < 0:
         def wrapper(raw):
-            return util.as_readonly_sequence(raw, item=item)
+            return util.as_readonly_sequence(raw, item=item, lazy=lazy)
     else:
         def wrapper(raw):
             if len(raw) > max:
                 raise ValueError(f'expected at most {max} items, got {raw!r}')
-            return util.as_readonly_sequence(raw, item=item)
+            return util.as_readonly_sequence(raw, item=item, lazy=lazy)
+    wrapper.spec = ('array', item, max, lazy)
     return wrapper
 
 
+##################################
+# schema compilation
+
+def compile_kind(coerce):
+    """Return an equivalent coercer with the wrapper layers flattened.
+
+    This applies to coercers built with kind(), mapping() and array()
+    (recursively).  Anything else is returned as-is.
+    """
+    try:
+        spec = coerce.spec
+    except AttributeError:
+        return coerce
+    kind, *args = spec
+
+    if kind == 'kind':
+        wrapped, = args
+        return compile_kind(wrapped)
+
+    elif kind == 'mapping':
+        key, value, lazy = args
+        if lazy:
+            return coerce
+        key = compile_kind(key) if key is not None else (lambda k: k)
+        value = compile_kind(value) if value is not None else (lambda v: v)
+        def coerce_mapping(raw, _proxy=types.MappingProxyType):
+            try:
+                items = raw.items()
+            except AttributeError:
+                items = raw
+            return _proxy({key(k): value(v) for k, v in items})
+        return coerce_mapping
+
+    elif kind == 'array':
+        item, max, lazy = args
+        if lazy:
+            return coerce
+        item = compile_kind(item) if item is not None else None
+        def coerce_array(raw):
+            if max >= 0 and len(raw) > max:
+                raise ValueError(f'expected at most {max} items, got {raw!r}')
+            return tuple(map(item, raw)) if item else tuple(raw)
+        return coerce_array
+
+    elif kind == 'validator':
+        return coerce
+
+    else:
+        raise NotImplementedError(kind)
+
+
+def iter_kind_errors(coerce, value, path):
+    """Yield a Diagnostic for every problem coercing the value.
+
+    Like compile_kind(), this looks inside kind(), mapping() and array()
+    so that nested problems are reported with their full path.
+    """
+    try:
+        kind, *args = coerce.spec
+    except AttributeError:
+        kind = None
+
+    if kind == 'kind':
+        wrapped, = args
+        yield from iter_kind_errors(wrapped, value, path)
+
+    elif kind == 'mapping':
+        key, value_kind, _ = args
+        try:
+            items = value.items()
+        except AttributeError:
+            items = value
+        try:
+            items = [(k, v) for k, v in items]
+        except (TypeError, ValueError):
+            yield Diagnostic(path, 'mapping', f'expected mapping, got {value!r}')
+            return
+        for k, v in items:
+            itempath = f'{path}.{k}'
+            if key is not None:
+                yield from iter_kind_errors(key, k, itempath)
+            if value_kind is not None:
+                yield from iter_kind_errors(value_kind, v, itempath)
+
+    elif kind == 'array':
+        item, max, _ = args
+        try:
+            count = len(value)
+        except TypeError:
+            yield Diagnostic(path, 'array', f'expected array, got {value!r}')
+            return
+        if max >= 0 and count > max:
+            yield Diagnostic(path, 'array',
+                             f'expected at most {max} items, got {count}')
+        if item is not None:
+            for i, v in enumerate(value):
+                yield from iter_kind_errors(item, v, f'{path}[{i}]')
+
+    elif kind == 'validator':
+        vkind, options = args
+        yield from util.iter_validation_errors(value, path,
+                                               kind=vkind, options=options)
+
+    else:
+        try:
+            coerce(value)
+        except Exception as exc:
+            name = getattr(coerce, '__qualname__', None) or repr(coerce)
+            yield Diagnostic(path, name, str(exc))
+
+
+def compile_record(kinds, *, defaults=None):
+    """Return a function that coerces a dict of raw field values.
+
+    The returned function takes the raw values and returns a new dict
+    with "defaults" filled in.  Fields without a kind are left as-is.
+    """
+    coercers = {field: compile_kind(coerce)
+                for field, coerce in kinds.items()}
+    defaults = dict(defaults or ())
+    def coerce_record(raw):
+        values = dict(defaults)
+        for field, value in raw.items():
+            coerce = coercers.get(field)
+            if coerce is not None:
+                try:
+                    value = coerce(value)
+                except Exception as exc:
+                    raise ValueError(f'({field}) {exc}')
+            values[field] = value
+        return values
+    return coerce_record
+
+
 semver = kind(util.SemVer.parse)
 verspec = kind(util.VersionSpec.parse)
 
 
 def person(raw):
     if isinstance(raw, str):
-        return util.Person.parse()
+        return util.Person.parse(raw)
     else:
         return util.Person(**raw)
 
@@ -49,6 +189,14 @@ scripts = mapping(validator('npm-script'),
                   validator('nonempty'))
 
 
+def dependencies(*, lazy=False):
+    return mapping(validator('npm-module'),
+                   validator(options=[verspec,
+                                      validator(kind='filename'),
+                                      validator(kind='uri')]),
+                   lazy=lazy)
+
+
 #class Scripts(Mapping):
 #    """..."""
 #    def __init__(self, scripts):
@@ -81,8 +229,280 @@ class GalleryBanner:
     """..."""
 
 
+def _pick(raw, fields):
+    # Unknown keys are ignored.
+    return {k: v for k, v in raw.items() if k in fields}
+
+
+def _as_items(raw):
+    # Some contribution points allow a single object instead of a list.
+    if not raw:
+        return ()
+    elif isinstance(raw, Mapping):
+        return (raw,)
+    else:
+        return tuple(raw)
+
+
+@util.as_namedtuple('command title category')
+class Command:
+    """A single contributed command."""
+
+    __slots__ = ()
+
+    def __new__(cls, command, title=None, category=None):
+        self = super(Command, cls).__new__(
+                cls,
+                command=util.as_str(command) or None,
+                title=util.as_str(title) or None,
+                category=util.as_str(category) or None,
+                )
+        return self
+
+    def validate(self):
+        if not self.command:
+            raise TypeError('missing command')
+
+
+@util.as_namedtuple('key command when mac linux win')
+class Keybinding:
+    """A single contributed keybinding."""
+
+    __slots__ = ()
+
+    PLATFORMS = ('mac', 'linux', 'win')
+    MODIFIERS = ('ctrl', 'shift', 'alt', 'meta')
+    ALIASES = {
+            'cmd': 'meta',
+            'win': 'meta',
+            'control': 'ctrl',
+            'option': 'alt',
+            }
+
+    @classmethod
+    def normalize_chord(cls, text):
+        """Return the canonical form of the key sequence.
+
+        Modifiers are lower-cased, de-aliased and sorted, so that
+        "Shift+Ctrl+P" and "ctrl+shift+p" are the same.  The plus key
+        itself is supported (e.g. "ctrl++").
+        """
+        chords = []
+        for chord in text.lower().split():
+            if chord == '+':
+                mods, key = [], '+'
+            elif chord.endswith('++'):
+                # The last "+" is the key and the one before it is the
+                # separator.
+                mods, key = chord[:-2].split('+'), '+'
+            else:
+                *mods, key = chord.split('+')
+            mods = {cls.ALIASES.get(m, m) for m in mods}
+            mods = sorted(mods, key=(lambda m: (cls.MODIFIERS.index(m)
+                                                if m in cls.MODIFIERS
+                                                else len(cls.MODIFIERS), m)))
+            chords.append('+'.join([*mods, key]))
+        return ' '.join(chords)
+
+    def __new__(cls, key=None, command=None, when=None,
+                mac=None, linux=None, win=None):
+        self = super(Keybinding, cls).__new__(
+                cls,
+                key=util.as_str(key) or None,
+                command=util.as_str(command) or None,
+                when=util.as_str(when) or None,
+                mac=util.as_str(mac) or None,
+                linux=util.as_str(linux) or None,
+                win=util.as_str(win) or None,
+                )
+        return self
+
+    def chords(self):
+        """Yield (platform, normalized chord) for each platform.
+
+        The platform is None for the default key.
+        """
+        if self.key:
+            yield None, self.normalize_chord(self.key)
+        for platform in self.PLATFORMS:
+            key = getattr(self, platform)
+            if key:
+                yield platform, self.normalize_chord(key)
+
+    def validate(self):
+        if not self.command:
+            raise TypeError('missing command')
+        if not self.key and not any(getattr(self, p) for p in self.PLATFORMS):
+            raise TypeError('missing key')
+
+
+@util.as_namedtuple('id aliases extensions filenames')
+class Language:
+    """A single contributed language."""
+
+    __slots__ = ()
+
+    def __new__(cls, id, aliases=None, extensions=None, filenames=None):
+        self = super(Language, cls).__new__(
+                cls,
+                id=util.as_str(id) or None,
+                aliases=tuple(util.as_sequence(aliases or (), item=util.as_str)),
+                extensions=tuple(util.as_sequence(extensions or (), item=util.as_str)),
+                filenames=tuple(util.as_sequence(filenames or (), item=util.as_str)),
+                )
+        return self
+
+    def validate(self):
+        if not self.id:
+            raise TypeError('missing id')
+
+
+@util.as_namedtuple('language scopeName path')
+class Grammar:
+    """A single contributed TextMate grammar."""
+
+    __slots__ = ()
+
+    def __new__(cls, language=None, scopeName=None, path=None):
+        self = super(Grammar, cls).__new__(
+                cls,
+                language=util.as_str(language) or None,
+                scopeName=util.as_str(scopeName) or None,
+                path=util.as_str(path) or None,
+                )
+        return self
+
+    def validate(self):
+        if not self.scopeName:
+            raise TypeError('missing scopeName')
+        if not self.path:
+            raise TypeError('missing path')
+
+
+@util.as_namedtuple('commands keybindings languages grammars configuration other')
 class Contributions:
-    """..."""
+    """The "contributes" section of a manifest.
+
+    Contribution points without a specific model are kept (as-is) in
+    "other".  Each "configuration" section is also kept as the raw
+    mapping (see the "settings" property).
+    """
+
+    __slots__ = ()
+
+    KINDS = {
+            'commands': Command,
+            'keybindings': Keybinding,
+            'languages': Language,
+            'grammars': Grammar,
+            }
+
+    @classmethod
+    def from_raw(cls, raw):
+        """Return the contributions for the given "contributes" data.
+
+        The result (if not None) is guaranteed to be valid.
+        """
+        if not raw:
+            return None
+        elif isinstance(raw, cls):
+            return raw
+        kwargs = {}
+        other = {}
+        for point, value in raw.items():
+            if point in cls.KINDS or point == 'configuration':
+                kwargs[point] = value
+            else:
+                other[point] = value
+        self = cls(**kwargs, other=other)
+        self.validate()
+        return self
+
+    def __new__(cls, commands=None, keybindings=None, languages=None,
+                grammars=None, configuration=None, other=None):
+        points = {
+                'commands': commands,
+                'keybindings': keybindings,
+                'languages': languages,
+                'grammars': grammars,
+                }
+        kwargs = {}
+        for point, kind in cls.KINDS.items():
+            items = _as_items(points[point])
+            kwargs[point] = tuple(
+                    item if isinstance(item, kind)
+                    else kind(**_pick(item, kind._fields))
+                    for item in items)
+        self = super(Contributions, cls).__new__(
+                cls,
+                configuration=_as_items(configuration),
+                other=util.as_readonly_mapping(other or {}),
+                **kwargs
+                )
+        return self
+
+    def as_raw(self):
+        """Return the JSON-compatible form of the contributions."""
+        raw = {}
+        for point in self.KINDS:
+            items = getattr(self, point)
+            if items:
+                raw[point] = [_to_raw(item) for item in items]
+        if self.configuration:
+            raw['configuration'] = [_to_raw(section)
+                                    for section in self.configuration]
+        raw.update((point, _to_raw(value))
+                   for point, value in self.other.items())
+        return raw
+
+    @property
+    def settings(self):
+        """The names of all the contributed settings."""
+        return [name
+                for section in self.configuration
+                for name in (section.get('properties') or {})]
+
+    def validate(self):
+        for point in self.KINDS:
+            for i, item in enumerate(getattr(self, point)):
+                try:
+                    item.validate()
+                except TypeError as exc:
+                    raise ValueError(f'({point}[{i}]) {exc}')
+
+
+def _validate_fields(items):
+    # "items" is (field, value) pairs.
+    for field, value in items:
+        try:
+            validate = value.validate
+        except AttributeError:
+            continue
+        try:
+            validate()
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f'({field}) {exc}')
+
+
+def _to_raw(value):
+    """Return the JSON-compatible form of a coerced manifest value."""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    elif isinstance(value, str):
+        return str(value)
+    elif isinstance(value, (util.SimpleVersion, util.Version)):
+        return str(value)
+    elif isinstance(value, Contributions):
+        return value.as_raw()
+    elif isinstance(value, Mapping):
+        return {str(k): _to_raw(v) for k, v in value.items()}
+    elif hasattr(value, '_asdict'):
+        # Person, Command, etc.
+        return {k: _to_raw(v)
+                for k, v in value._asdict().items()
+                if v is not None and v != ()}
+    else:
+        return [_to_raw(v) for v in value]
 
 
 class Repository:
@@ -172,66 +592,288 @@ class Manifest:
             'license': validator('license'),
             # displayName
             # description
-            'categories': kind(Categories),
-            'keywords': kind(Keywords),  # array(str, max=5),
+            'categories': array(validator('nonempty')),  # XXX kind(Categories)
+            'keywords': array(validator('nonempty')),  # XXX kind(Keywords), max=5
             'preview': validator(bool),
-            'badges': array(kind(Badge)),
+            'badges': array(validator(dict)),  # XXX kind(Badge)
             'markdown': validator(options=['github', 'standard']),
             'qna': validator(options=['marketplace',
                                      validator('uri'),
                                      False]),
             'icon': validator('filename'),
-            'galleryBanner': kind(GalleryBanner),
+            'galleryBanner': validator(dict),  # XXX kind(GalleryBanner)
             # technical
             'main': validator('npm-module'),
-            'contributes': kind(Contributions),
+            'contributes': kind(Contributions.from_raw),
             'activationEvents': validator('[event]'),
             'extensionDependencies': validator('[extension-id]'),
-            'dependencies': mapping(validator('npm-module'),
-                                    validator(options=[verspec,
-                                                       validator(kind='filename'),
-                                                       validator(kind='uri')])),
-            'devDependencies': mapping(validator('npm-module'),
-                                       validator(options=[verspec,
-                                                          validator(kind='filename'),
-                                                          validator(kind='uri')])),
+            'dependencies': dependencies(),
+            'devDependencies': dependencies(),
             'scripts': scripts,
             'extensionPack': validator('[extension-id]'),
 
             'author': kind(person),
             'contributors': array(kind(person)),
             'homepage': validator('uri'),
-            'repository': kind(Repository),
-            'bugs': kind(Bugs),
+            'repository': validator(options=[validator('nonempty'),  # XXX kind(Repository)
+                                             validator(dict)]),
+            'bugs': validator(options=[validator('uri'),  # XXX kind(Bugs)
+                                       validator(dict)]),
             }
 
+    INDENT = 4
+
+    # The decoded data the manifest was loaded from (if any).
+    _raw = util.Slot(None)
+    # The JSON text the manifest was partially loaded from (if any).
+    _text = util.Slot(None)
+    # The file the manifest was loaded from (if any).
+    _filename = util.Slot(None)
+    # The fields that have been changed (via _replace()) since loading.
+    _changed = util.Slot(frozenset())
+
+    @classmethod
+    def from_file(cls, manifestfile, fields=None, *,
+                  _open=open,
+                  ):
+        """Return the manifest in the given package.json file.
+
+        See from_json() about "fields".
+        """
+        if isinstance(manifestfile, str):
+            filename = manifestfile
+            with _open(filename, encoding='utf-8') as manifestfile:
+                self = cls.from_file(manifestfile, fields)
+            self._filename = filename
+            return self
+        return cls.from_json(manifestfile.read(), fields)
+
+    @classmethod
+    def from_json(cls, text, fields=None, *,
+                  _load_fields=util.load_json_fields,
+                  _loads=json.loads,
+                  ):
+        """Return the manifest in the given JSON text.
+
+        If "fields" is provided then only those fields are decoded and
+        coerced (decoding stops once they have all been found), and the
+        other fields are left as None.
+        """
+        if fields is None:
+            return cls.from_data(_loads(text))
+        fields = list(fields)
+        self = cls.from_data(_load_fields(text, fields), fields)
+        # The rest of the text is only decoded if the manifest gets
+        # written back out (see as_raw()).
+        self._raw = None
+        self._text = text
+        return self
+
+    @classmethod
+    def from_data(cls, data, fields=None):
+        """Return the manifest for the given decoded package.json data.
+
+        If "fields" is provided then only those fields are coerced and
+        the other fields are left as None.  Either way, the data is kept
+        (as-is) so that to_json() preserves the fields (and their order)
+        that were not changed.  That includes any keys the manifest
+        doesn't know about (e.g. "private" or "extensionKind").
+        """
+        if fields is None:
+            self = cls(**{k: v for k, v in data.items() if k in cls._fields})
+            self._raw = data
+            return self
+
+        fields = list(fields)
+        unknown = set(fields) - set(cls._fields)
+        if unknown:
+            raise ValueError(f'unsupported fields {sorted(unknown)}')
+        raw = {f: data[f] for f in fields if f in data}
+        missing = [f for f in cls.REQUIRED if f in fields and f not in raw]
+        if missing:
+            raise ValueError(f'missing required fields {missing}')
+        coerce, _, _ = cls._compiled()
+        values = coerce(raw)
+        for field in cls.REQUIRED:
+            values.setdefault(field, None)
+        self = super(Manifest, cls).__new__(cls, **values)
+        self._raw = data
+        return self
+
     def __new__(cls, *_args, **kwargs):
-        defaults = {f: None
-                    for f in cls._fields
-                    if f not in cls.REQUIRED}
-        defaults.update(cls.DEFAULTS)
-        args = []
         for field, arg in zip(cls._fields, _args):
-            coerce = cls.KINDS[field]
-            try:
-                args.append(coerce(arg))
-            except Exception as exc:
-                raise ValueError(f'({field}) {exc}')
-            defaults.ppo(field, None)
-        args.extend(_args[len(args):])
+            if field in kwargs:
+                raise TypeError(f'got multiple values for {field!r}')
+            kwargs[field] = arg
+        if len(_args) > len(cls._fields):
+            raise TypeError(f'expected at most {len(cls._fields)} args, '
+                            f'got {len(_args)}')
+        # Keys we don't know about are passed through to the JSON as-is.
+        unknown = {k: kwargs.pop(k) for k in list(kwargs)
+                   if k not in cls._fields}
+        coerce, _, _ = cls._compiled()
+        kwargs = coerce(kwargs)
+        self = super(Manifest, cls).__new__(cls, **kwargs)
+        if unknown:
+            # Every set field is a change relative to the unknown keys.
+            changed = self.changed
+            self._raw = unknown
+            self._changed = frozenset(changed)
+        return self
+
+    def __reduce__(self):
+        # The values are already coerced, so unpickling skips __new__().
+        return (tuple.__new__, (type(self), tuple(self)), dict(self.__dict__))
+
+    def _replace(self, **kwargs):
+        """Return a copy of the manifest with the given fields changed.
+
+        The new values are coerced.  The fields that actually changed
+        are tracked, so to_json() and write() know what to update.
+        """
+        _, coercers, _ = self._compiled()
+        values = {}
         for field, value in kwargs.items():
+            coerce = coercers.get(field)
+            if coerce is not None and value is not None:
+                try:
+                    value = coerce(value)
+                except Exception as exc:
+                    raise ValueError(f'({field}) {exc}')
+            values[field] = value
+        unknown = set(values) - set(self._fields)
+        if unknown:
+            raise ValueError(f'got unexpected field names {sorted(unknown)}')
+        # The other values are already coerced, so we skip __new__().
+        copied = tuple.__new__(type(self), [values.get(f, v)
+                                            for f, v in zip(self._fields, self)])
+        copied._raw = self._raw
+        copied._text = self._text
+        copied._filename = self._filename
+        copied._changed = self._changed | {f for f, v in values.items()
+                                           if v != getattr(self, f)}
+        return copied
+
+    @property
+    def changed(self):
+        """The fields that have changed since the manifest was loaded.
+
+        If it wasn't loaded (from JSON) then every set field counts.
+        """
+        if self._raw is None and self._text is None:
+            return {field for field, value in zip(self._fields, self)
+                    if value is not None
+                    and value != self.DEFAULTS.get(field)}
+        return set(self._changed)
+
+    def as_raw(self):
+        """Return the JSON-compatible data for the manifest.
+
+        Fields that have not changed since loading are passed through
+        as-is (in their original order), as are unknown fields.  Any
+        other set fields follow, in field order.
+        """
+        raw = self._source_data()
+        data = {} if raw is None else dict(raw)
+        changed = self.changed
+        for field, value in zip(self._fields, self):
+            if field not in changed:
+                continue
+            if value is None:
+                data.pop(field, None)
+            else:
+                data[field] = _to_raw(value)
+        return data
+
+    def _source_data(self, *,
+                     _loads=json.loads,
+                     ):
+        # This is the full decoded data the manifest was loaded from,
+        # including any fields that were not loaded.
+        if self._raw is None and self._text is not None:
+            self._raw = _loads(self._text)
+            self._text = None
+        return self._raw
+
+    def to_json(self):
+        """Return the package.json text for the manifest."""
+        text = json.dumps(self.as_raw(),
+                          indent=self.INDENT,
+                          ensure_ascii=False)
+        return text + '\n'
+
+    def write(self, filename=None, *,
+              _open=open,
+              ):
+        """Write the manifest to the package.json file.
+
+        The file is left alone (and False is returned) if nothing would
+        change, so its mtime is preserved.  This means unchanged builds
+        don't trigger downstream rebuilds.
+        """
+        if filename is None:
+            filename = self._filename
+            if filename is None:
+                raise ValueError('missing filename')
+        if filename == self._filename and not self._changed:
+            # It hasn't changed since we loaded it.
+            return False
+        text = self.to_json()
+        try:
+            with _open(filename, encoding='utf-8') as infile:
+                if infile.read() == text:
+                    return False
+        except FileNotFoundError:
+            pass
+        with _open(filename, 'w', encoding='utf-8') as outfile:
+            outfile.write(text)
+        return True
+
+    @classmethod
+    def iter_errors(cls, raw):
+        """Yield a Diagnostic for every problem with the raw field values.
+
+        Unlike Manifest(**raw), this does not stop at the first problem.
+        The data is walked once, and each problem is yielded as soon as
+        it is found, so the caller may stop early (e.g. after N errors).
+        """
+        for field in cls.REQUIRED:
+            if raw.get(field) is None:
+                yield Diagnostic(field, 'required', 'missing required field')
+        for field, value in raw.items():
             try:
                 coerce = cls.KINDS[field]
             except KeyError:
                 continue
-            try:
-                kwargs[field] = coerce(value)
-            except Exception as exc:
-                raise ValueError(f'({field}) {exc}')
-            defaults.pop(field, None)
-        kwargs.update(defaults)
-        self = super(Manifest, cls).__new__(cls, *args, **kwargs)
-        return self
+            yield from iter_kind_errors(coerce, value, field)
+
+    @classmethod
+    def _compiled(cls):
+        """Return (coerce record, {field: coerce}, defaults) for the class.
+
+        They are compiled on first use.
+        """
+        try:
+            return cls.__dict__['_COMPILED']
+        except KeyError:
+            pass
+        defaults = {f: None
+                    for f in cls._fields
+                    if f not in cls.REQUIRED}
+        defaults.update(cls.DEFAULTS)
+        coercers = {field: compile_kind(coerce)
+                    for field, coerce in cls.KINDS.items()}
+        compiled = (
+                compile_record(coercers, defaults=defaults),
+                coercers,
+                defaults,
+                )
+        cls._COMPILED = compiled
+        return compiled
+
+    def validate(self):
+        """Make sure every field (including lazy ones) is fully valid."""
+        _validate_fields(zip(self._fields, self))
 
     def render(self):
         lines = [type(self).__name__ + '(']
@@ -239,3 +881,89 @@ class Manifest:
             lines.append(f'    {field}={value!r}')
         lines.append('    )')
         return os.linesep.join(lines)
+
+
+class LazyManifest:
+    """A manifest that coerces each field only when it is first used.
+
+    The raw values are kept as-is.  The first time a field is accessed
+    it is coerced (and validated) the same way Manifest does it, and
+    the result is cached.  Use validate_all() to coerce (and fully
+    validate) every field up front.
+    """
+
+    __slots__ = ('_raw', '__dict__')
+
+    MANIFEST = Manifest
+
+    # These can be big, so even their items are coerced only when used
+    # (or by validate_all()).
+    LAZY_KINDS = {
+            'dependencies': dependencies(lazy=True),
+            'devDependencies': dependencies(lazy=True),
+            }
+
+    @classmethod
+    def from_file(cls, manifestfile, *,
+                  _open=open,
+                  ):
+        """Return the lazy manifest in the given package.json file."""
+        if isinstance(manifestfile, str):
+            filename = manifestfile
+            with _open(filename, encoding='utf-8') as manifestfile:
+                return cls.from_file(manifestfile)
+        return cls.from_json(manifestfile.read())
+
+    @classmethod
+    def from_json(cls, text, *,
+                  _loads=json.loads,
+                  ):
+        """Return the lazy manifest in the given JSON text."""
+        return cls(**_loads(text))
+
+    def __init__(self, **raw):
+        # Keys the manifest doesn't know about are kept (but ignored).
+        for field in self.MANIFEST.REQUIRED:
+            if field not in raw:
+                raise TypeError(f'missing required field {field!r}')
+        self._raw = raw
+
+    def __repr__(self):
+        return f'{type(self).__name__}(**{self._raw!r})'
+
+    def __getattr__(self, name):
+        # This is only called the first time for each field, since the
+        # result is cached in the instance __dict__.
+        if name not in self.MANIFEST._fields:
+            raise AttributeError(name)
+        _, coercers, defaults = self.MANIFEST._compiled()
+        try:
+            value = self._raw[name]
+        except KeyError:
+            value = defaults[name]
+        else:
+            coerce = self.LAZY_KINDS.get(name) or coercers.get(name)
+            if coerce is not None:
+                try:
+                    value = coerce(value)
+                except Exception as exc:
+                    raise ValueError(f'({name}) {exc}')
+        self.__dict__[name] = value
+        return value
+
+    @property
+    def _fields(self):
+        return self.MANIFEST._fields
+
+    def _asdict(self):
+        return {field: getattr(self, field) for field in self._fields}
+
+    def iter_errors(self):
+        """Yield a Diagnostic for every problem with the raw fields."""
+        return self.MANIFEST.iter_errors(self._raw)
+
+    def validate_all(self):
+        """Coerce and fully validate every field (stop at the first error)."""
+        # Each field is only coerced when its turn comes.
+        _validate_fields((field, getattr(self, field))
+                         for field in self._fields)
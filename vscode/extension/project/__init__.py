@@ -1,3 +1,4 @@
+import importlib
 import os.path
 
 
@@ -5,16 +6,35 @@ DATA_DIR = os.path.dirname(__file__)
 TEMPLATES_DIR = os.path.join(DATA_DIR, '.templates')
 
 
-# Pull in exported names.
-from .info import (
-        Config,
-        Files,
-        Project,
-        )
-from .lifecycle import (
-        initialize,
-        generate_extension,
-        )
+# Exported names are pulled in lazily (like in vscode.util).
+_EXPORTS = {
+    '.info': (
+        'Config',
+        'Files',
+        'Project',
+        ),
+    '.lifecycle': (
+        'initialize',
+        'generate_extension',
+        ),
+    }
+_LOOKUP = {name: modname
+           for modname, names in _EXPORTS.items()
+           for name in names}
+
+
+def __getattr__(name):
+    try:
+        modname = _LOOKUP[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(modname, __name__), name)
+    globals()[name] = value  # Only look it up once.
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LOOKUP))
 
 
 # Clean up the namespace.
@@ -3,44 +3,121 @@ import os
 import os.path
 import sys
 
-from . import lifecycle, info
 
+# This is the package's logger (rather than one for __main__), so that
+# configuring it also shows what the other modules log (e.g. lifecycle
+# during "generate --watch").
+logger = logging.getLogger(__package__)
 
-logger = logging.getLogger(__name__)
 
+# The lifecycle and info modules (and vscode.util) are imported only
+# when a command actually runs, to keep startup (e.g. --help) fast.
 
 def _new_config(**kwargs):
-    cfg = info.Config(**kwargs)
+    from .info import Config
+    cfg = Config(**kwargs)
     cfg.validate()
     return cfg
 
 
+def _report_plan(plan, *,
+                 _print=print,
+                 ):
+    marks = {'create': '+', 'change': '~'}
+    for relpath, status in plan.files:
+        if status in marks:
+            _print(f'{marks[status]} {relpath}')
+    _print(f'{plan.rootdir}: {plan.summary()}')
+    # Like "git diff --exit-code".
+    return 1 if plan.has_changes else 0
+
+
 #######################################
 # commands
 
 def cmd_init(root=None, *,
+             workers=1,
+             plan=False,
              _new_config=_new_config,
-             _init=lifecycle.initialize,
+             _init=None,
+             _plan=None,
              **kwargs
              ):
+    if plan:
+        if _plan is None:
+            from .lifecycle import plan_initialize as _plan
+        cfg = _new_config(**kwargs)
+        return _report_plan(_plan(cfg, root))
+    if _init is None:
+        from .lifecycle import initialize as _init
     logger.info(f'seting up the project at {root or "."} ...')
     cfg = _new_config(**kwargs)
-    _init(cfg, root)
+    _init(cfg, root, workers=workers)
     logger.info('done!')
 
 
 def cmd_generate(root=None, outdir=None, *,
-                 _generate=lifecycle.generate_extension,
+                 workers=1,
+                 hardlink=False,
+                 watch=False,
+                 poll=False,
+                 plan=False,
+                 _generate=None,
+                 _watch=None,
+                 _plan=None,
                  **kwargs
                  ):
+    if plan:
+        if _plan is None:
+            from .lifecycle import plan_extension as _plan
+        return _report_plan(_plan(root, outdir, **kwargs))
+    if watch:
+        if _watch is None:
+            from .lifecycle import watch_extension as _watch
+        logger.info(f'generating the extension in {root or "."}/build/ (watching) ...')
+        try:
+            _watch(root, outdir,
+                   workers=workers, hardlink=hardlink, poll=poll,
+                   **kwargs)
+        except KeyboardInterrupt:
+            logger.info('stopped watching')
+        return
+    if _generate is None:
+        from .lifecycle import generate_extension as _generate
     logger.info(f'generating the extension in {root or "."}/build/ ...')
-    _generate(root, outdir, **kwargs)
+    _generate(root, outdir, workers=workers, hardlink=hardlink, **kwargs)
+    logger.info('done!')
+
+
+def cmd_generate_all(root=None, *,
+                     workers=None,
+                     hardlink=False,
+                     _find=None,
+                     _generate_all=None,
+                     ):
+    if _find is None:
+        from .batch import find_projects as _find
+    if _generate_all is None:
+        from .batch import generate_all as _generate_all
+    projects = _find(root or '.')
+    logger.info(f'generating {len(projects)} extensions under {root or "."} ...')
+    results = _generate_all(projects, workers=workers, hardlink=hardlink)
+    failed = 0
+    for result in results:
+        if result.failed:
+            failed += 1
+            logger.error(f'{result.root}: {result.error}')
+        else:
+            logger.info(f'{result.root}: {len(result.written)} files written')
+    if failed:
+        raise Exception(f'{failed} of {len(results)} extensions failed')
     logger.info('done!')
 
 
 COMMANDS = {
     'init': cmd_init,
     'generate': cmd_generate,
+    'generate-all': cmd_generate_all,
 }
 
 
@@ -75,6 +152,10 @@ def parse_args(prog=sys.argv[0], argv=sys.argv[1:]):
     # XXX minvscode
     # XXX license
     # XXX author
+    sub_init.add_argument('--workers', type=int, default=1,
+                          help='write the files using this many threads (0 means the default)')
+    sub_init.add_argument('--plan', action='store_true',
+                          help='only show which files would be created or changed (exit with 1 if any)')
     sub_init.add_argument('root')
 
     sub_generate = subs.add_parser('generate',
@@ -82,8 +163,28 @@ def parse_args(prog=sys.argv[0], argv=sys.argv[1:]):
                                    description='Produce the extension code for the project (in the "build" directory)',
                                    )
     sub_generate.add_argument('--outdir')
+    sub_generate.add_argument('--workers', type=int, default=1,
+                              help='write the files using this many threads (0 means the default)')
+    sub_generate.add_argument('--hardlink', action='store_true',
+                              help='hardlink project files into the output dir (where possible) instead of copying them')
+    sub_generate.add_argument('--plan', action='store_true',
+                              help='only show which files would be created or changed (exit with 1 if any)')
+    sub_generate.add_argument('--watch', action='store_true',
+                              help='keep running and regenerate whenever the inputs change')
+    sub_generate.add_argument('--poll', action='store_true',
+                              help='(with --watch) poll for changes instead of using inotify')
     sub_generate.add_argument('root')
 
+    sub_generate_all = subs.add_parser('generate-all',
+                                       parents=[common],
+                                       description='Generate every extension project (dir with a [vscode_ext] setup.cfg) under the root',
+                                       )
+    sub_generate_all.add_argument('--workers', type=int, default=0,
+                                  help='generate this many projects at once (0 means the default)')
+    sub_generate_all.add_argument('--hardlink', action='store_true',
+                                  help='hardlink project files into the output dirs (where possible) instead of copying them')
+    sub_generate_all.add_argument('root', nargs='?')
+
     args = parser.parse_args(argv)
     ns = vars(args)
 
@@ -96,6 +197,11 @@ def parse_args(prog=sys.argv[0], argv=sys.argv[1:]):
         parser.error('missing command')
 
     args.root = args.root or '.'
+    if args.workers == 0:
+        args.workers = None
+
+    if cmd == 'generate' and args.plan and args.watch:
+        parser.error('--plan and --watch are mutually exclusive')
 
     if cmd == 'init':
         if args.name == '.':
@@ -119,7 +225,7 @@ def main(cmd, *,
     except KeyError:
         raise ValueError(f'unsupported cmd {cmd!r}')
 
-    run_cmd(**kwargs)
+    return run_cmd(**kwargs)
 
 
 if __name__ == '__main__':
@@ -127,4 +233,5 @@ if __name__ == '__main__':
     cmd, kwargs, verbosity, logfile, traceback_cm = parse_args()
     configure_logger(logger, verbosity, logfile=logfile)
     with traceback_cm:
-        main(cmd, **kwargs)
+        rc = main(cmd, **kwargs)
+    sys.exit(rc)
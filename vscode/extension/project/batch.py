@@ -0,0 +1,107 @@
+import configparser
+import os
+import os.path
+import threading
+
+from vscode import util
+from . import info, lifecycle
+
+
+# Directories that never hold projects (and may be huge).
+SKIPPED = {
+        'node_modules',
+        '__pycache__',
+        }
+
+
+@util.as_namedtuple('root written error')
+class BatchResult:
+    """The outcome of generating a single project."""
+
+    __slots__ = ()
+
+    @property
+    def failed(self):
+        return self.error is not None
+
+
+def is_project(dirname, *,
+               _open=open,
+               ):
+    """Return True if the directory has a setup.cfg with [vscode_ext]."""
+    cfgfile = os.path.join(dirname, 'setup.cfg')
+    ini = configparser.ConfigParser()
+    try:
+        with _open(cfgfile) as infile:
+            ini.read_file(infile)
+    except (OSError, configparser.Error):
+        return False
+    return ini.has_section('vscode_ext')
+
+
+def find_projects(root, *,
+                  _walk=os.walk,
+                  _is_project=is_project,
+                  ):
+    """Return the (sorted) extension project dirs under the given root.
+
+    Hidden directories are skipped, as are the subdirectories of each
+    project found.
+    """
+    root = util.resolve_filename(root)
+    found = []
+    for dirname, subdirs, files in _walk(root):
+        if 'setup.cfg' in files and _is_project(dirname):
+            found.append(dirname)
+            subdirs[:] = []
+            continue
+        subdirs[:] = sorted(name for name in subdirs
+                            if not name.startswith('.')
+                            and name not in SKIPPED)
+    return sorted(found)
+
+
+def generate_all(projects, *,
+                 workers=None,
+                 hardlink=False,
+                 _generate=lifecycle.generate_extension,
+                 _get_author=util.get_git_committer,
+                 _get_repo=util.get_git_repo_url,
+                 ):
+    """Generate each of the given projects and return the BatchResults.
+
+    The projects are generated concurrently, using a thread pool of
+    size "workers" (None means the default size).  Everything that can
+    be shared is only loaded once: the compiled templates (see
+    templates.CACHE), and the git info used for config defaults.  A
+    failure in one project does not stop the others.
+    """
+    # Each of these is looked up at most once.
+    get_author = _once(_get_author)
+    get_repo = _once(_get_repo)
+
+    def generate(root):
+        try:
+            files = info.Files.from_raw(root)
+            cfg = info.Config.from_file(files.cfgfile,
+                                        _get_author=get_author,
+                                        _get_repo=get_repo,
+                                        )
+            project = info.Project(cfg, files)
+            written = _generate(project, hardlink=hardlink)
+        except Exception as exc:
+            return BatchResult(root, None, exc)
+        return BatchResult(root, written, None)
+    return util.run_all(generate, projects, workers=workers)
+
+
+def _once(func):
+    # Like functools.lru_cache() for a no-arg function, but thread-safe.
+    lock = threading.Lock()
+    results = []
+    def wrapper():
+        with lock:
+            if not results:
+                results.append(func())
+        return results[0]
+    return wrapper
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import os.path
+
+from vscode import util
+
+
+FILENAME = '.buildstate.json'
+# Bump this whenever the way outputs are produced changes, so that
+# existing state is thrown away.
+VERSION = 2
+
+
+def hash_bytes(data):
+    """Return the hex digest for the given bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(filename, *,
+              _open=open,
+              ):
+    """Return the hex digest for the contents of the given file."""
+    digest = hashlib.sha256()
+    with _open(filename, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_ns(ns):
+    """Return the hex digest for the given template namespace."""
+    text = json.dumps({k: str(v) for k, v in ns.items()}, sort_keys=True)
+    return hash_bytes(text.encode('utf-8'))
+
+
+class BuildState:
+    """What went into each generated file (for incremental builds).
+
+    For each output (relative to the output dir) we keep a key for its
+    inputs and the output's size and mtime.  An output is current if
+    the key matches and the file on disk hasn't been touched since.
+
+    Source hashes are cached by (size, mtime), so unchanged sources
+    are not re-read.
+    """
+
+    @classmethod
+    def load(cls, outdir, *,
+             _read_all=util.read_all,
+             ):
+        """Return the build state saved in the output dir.
+
+        If there isn't any (or it is unusable) then the state is empty,
+        which means everything gets generated.
+        """
+        filename = os.path.join(outdir, FILENAME)
+        try:
+            data = json.loads(_read_all(filename))
+        except (FileNotFoundError, ValueError):
+            data = None
+        if not isinstance(data, dict) or data.get('version') != VERSION:
+            return cls(outdir)
+        return cls(outdir,
+                   outputs=data.get('outputs'),
+                   sources=data.get('sources'),
+                   )
+
+    def __init__(self, outdir, outputs=None, sources=None):
+        self.outdir = outdir
+        self._outputs = dict(outputs or ())
+        self._sources = dict(sources or ())
+        self._seen = set()
+        self._hashed = set()
+        # The outputs found to be up to date.
+        self.current = set()
+        self._dirty = False
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.outdir!r})'
+
+    @property
+    def filename(self):
+        return os.path.join(self.outdir, FILENAME)
+
+    def hash_source(self, filename, *,
+                    _stat=os.stat,
+                    _hash_file=hash_file,
+                    ):
+        """Return the content hash for the given source file."""
+        self._hashed.add(filename)
+        st = _stat(filename)
+        cached = self._sources.get(filename)
+        if cached and cached[:2] == [st.st_size, st.st_mtime_ns]:
+            return cached[2]
+        digest = _hash_file(filename)
+        self._sources[filename] = [st.st_size, st.st_mtime_ns, digest]
+        self._dirty = True
+        return digest
+
+    def inputs_key(self, *sources, extra=()):
+        """Return the key for the given source files and extra values."""
+        parts = [str(VERSION)]
+        parts.extend(self.hash_source(source) for source in sources)
+        parts.extend(extra)
+        return hash_bytes('\0'.join(parts).encode('utf-8'))
+
+    def is_current(self, relpath, inputs, *,
+                   _stat=os.stat,
+                   ):
+        """Return True if the output is up-to-date for the given inputs."""
+        self._seen.add(relpath)
+        entry = self._outputs.get(relpath)
+        if not entry or entry[0] != inputs:
+            return False
+        try:
+            st = _stat(os.path.join(self.outdir, relpath))
+        except FileNotFoundError:
+            return False
+        if entry[1:] != [st.st_size, st.st_mtime_ns]:
+            return False
+        self.current.add(relpath)
+        return True
+
+    def record(self, relpath, inputs, *,
+               _stat=os.stat,
+               ):
+        """Remember that the output was produced from the given inputs."""
+        self._seen.add(relpath)
+        st = _stat(os.path.join(self.outdir, relpath))
+        self._outputs[relpath] = [inputs, st.st_size, st.st_mtime_ns]
+        self._dirty = True
+
+    def save(self, *,
+             _write_all=util.write_all,
+             ):
+        """Write the state to the output dir, if it changed.
+
+        Outputs (and sources) that were not used since loading are
+        dropped first (e.g. a template was removed).
+        """
+        for entries, used in [(self._outputs, self._seen),
+                              (self._sources, self._hashed)]:
+            for key in list(entries):
+                if key not in used:
+                    del entries[key]
+                    self._dirty = True
+        if not self._dirty:
+            return False
+        data = {
+                'version': VERSION,
+                'outputs': self._outputs,
+                'sources': self._sources,
+                }
+        _write_all(self.filename, json.dumps(data, indent=1, sort_keys=True))
+        self._dirty = False
+        return True
@@ -40,6 +40,7 @@ class Config:
     @classmethod
     def from_file(cls, cfgfile, *,
                   _open=open,
+                  **kwargs
                   ):
         """Return a config matching the given setup.cfg file.
 
@@ -48,12 +49,12 @@ class Config:
         if isinstance(cfgfile, str):
             filename = cfgfile
             with _open(filename) as cfgfile:
-                return cls.from_file(cfgfile)
+                return cls.from_file(cfgfile, **kwargs)
 
         ini = configparser.ConfigParser()
         ini.read_file(cfgfile)
         raw = dict(ini['vscode_ext'])
-        self = cls(**raw)
+        self = cls(**raw, **kwargs)
         self.validate()
         return self
 
@@ -189,6 +190,8 @@ class Project:
 
         The result (if not None) is guaranteed to be valid.
         """
+        if isinstance(raw, cls):
+            return raw
         try:
             return cls.from_files(raw, **kwargs)
         except ValueError:
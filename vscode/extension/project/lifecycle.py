@@ -1,10 +1,13 @@
-import json
+import logging
 import os
 import os.path
-import shutil
 
 from vscode import util
-from . import templates, info, license
+from ..manifest import Manifest
+from . import templates, info, license, buildstate, outtree
+
+
+logger = logging.getLogger(__name__)
 
 
 OUT_DIR = '.build'
@@ -12,17 +15,15 @@ OUT_DIR = '.build'
 
 
 def initialize(cfg, root=None, *,
+               workers=1,
                _apply_templates=templates.apply_to_tree,
                _init_license=None,
                ):
     """Initalize the extension project directory with the given config."""
-    cfg = info.Config.from_raw(cfg)
-    if root and root.endswith(os.path.sep):
-        root = os.path.join(root, cfg.name)
-    proj = info.Project.from_files(root, cfg=cfg)
+    cfg, proj = _resolve_init(cfg, root)
 
     # Create the files and directories.
-    _apply_templates('project', proj.root, cfg._asdict())
+    _apply_templates('project', proj.root, cfg._asdict(), workers=workers)
     (_init_license or _write_license)(
             proj.LICENSE,
             cfg,
@@ -31,19 +32,45 @@ def initialize(cfg, root=None, *,
     return proj
 
 
+def plan_initialize(cfg, root=None, *,
+                    _iter_templates=templates.iter_tree,
+                    _render=templates.render,
+                    ):
+    """Return the outtree.Plan for initialize().  Nothing is written."""
+    cfg, proj = _resolve_init(cfg, root)
+    ns = cfg._asdict()
+    tree = outtree.OutputTree()
+    for relpath, source in _iter_templates('project'):
+        tree.add(relpath, _render(source, ns))
+    tree.add(os.path.relpath(proj.LICENSE, proj.root), _license_text(cfg))
+    return tree.plan(proj.root)
+
+
+def _resolve_init(cfg, root):
+    cfg = info.Config.from_raw(cfg)
+    if root and root.endswith(os.path.sep):
+        root = os.path.join(root, cfg.name)
+    proj = info.Project.from_files(root, cfg=cfg)
+    return cfg, proj
+
+
 def generate_extension(project=None, outdir=None, *,
+                       workers=1,
+                       hardlink=False,
                        _project_from_raw=info.Project.from_raw,
                        _abspath=os.path.abspath,
                        _projfiles=None,
                        _gen=None,
                        ):
-    """Produce all needed files to build an extension from the given root."""
-    project = _project_from_raw(project)
-    # No need to validate.
-    if outdir:
-        outdir = _abspath(outdir)
-    else:
-        outdir = os.path.join(project.root, OUT_DIR)
+    """Produce all needed files to build an extension from the given root.
+
+    If "workers" is not 1 then the files are written using a thread
+    pool of that size (None means the default size).  With "hardlink",
+    project files are hardlinked into the output dir where possible,
+    rather than copied.
+    """
+    project, outdir = _resolve_generate(project, outdir,
+                                        _project_from_raw, _abspath)
     if _projfiles is None:
         _projfiles = _get_project_files(project.root)
     return (_gen or _generate)(
@@ -51,68 +78,190 @@ def generate_extension(project=None, outdir=None, *,
             project.cfg,
             _projfiles,
             outdir,
+            workers=workers,
+            hardlink=hardlink,
             )
 
 
+def plan_extension(project=None, outdir=None, *,
+                   _project_from_raw=info.Project.from_raw,
+                   _abspath=os.path.abspath,
+                   _load_state=buildstate.BuildState.load,
+                   _build=(lambda *a: _build_tree(*a)),
+                   ):
+    """Return the outtree.Plan for generate_extension().
+
+    Nothing is written.  Outputs that the saved build state says are
+    up to date are not even rendered.
+    """
+    project, outdir = _resolve_generate(project, outdir,
+                                        _project_from_raw, _abspath)
+    projfiles = _get_project_files(project.root)
+    state = _load_state(outdir)
+    tree, _ = _build(project.root, project.cfg, projfiles, state)
+    return tree.plan(outdir, unchanged=state.current)
+
+
+def _resolve_generate(project, outdir, _project_from_raw, _abspath):
+    project = _project_from_raw(project)
+    # No need to validate.
+    if outdir:
+        outdir = _abspath(outdir)
+    else:
+        outdir = os.path.join(project.root, OUT_DIR)
+    return project, outdir
+
+
+def watch_extension(project=None, outdir=None, *,
+                    workers=1,
+                    hardlink=False,
+                    poll=False,
+                    _generate=generate_extension,
+                    _watch=None,
+                    ):
+    """Generate the extension, then regenerate it whenever it changes.
+
+    The project's setup.cfg and files and the extension templates are
+    watched.  Only the outputs whose inputs changed are regenerated
+    (see _generate()).  This runs until interrupted.
+    """
+    if _watch is None:
+        from .watch import watch as _watch
+    root = _project_root(project)
+    tmpldir = templates.resolve('extension')
+
+    def is_input(filename):
+        if filename.startswith(tmpldir + os.path.sep):
+            return True
+        if os.path.dirname(filename) != root:
+            return False
+        name = os.path.basename(filename)
+        return name == 'setup.cfg' or name[0].isupper()
+
+    def regenerate(changed):
+        changed = sorted(f for f in changed if is_input(f))
+        if not changed:
+            return
+        logger.info(f'changed: {", ".join(os.path.relpath(f, root) for f in changed)}')
+        try:
+            written = _generate(root, outdir, workers=workers, hardlink=hardlink)
+        except Exception as exc:
+            # Keep watching.
+            logger.error(f'generate failed ({exc})')
+        else:
+            logger.info(f'regenerated {len(written)} files')
+
+    written = _generate(root, outdir, workers=workers, hardlink=hardlink)
+    logger.info(f'generated {len(written)} files; watching for changes ...')
+    _watch({root: False, tmpldir: True}, regenerate, poll=poll)
+
+
+def _project_root(project):
+    if isinstance(project, str) or not project:
+        return util.resolve_filename(project)
+    return info.Project.from_raw(project).root
+
+
 def _generate(root, cfg, projfiles, outdir, *,
-             _mkdirs=os.makedirs,
-             _apply_templates=templates.apply_to_tree,
-             _update_manifest=None,
-             _copy_file=shutil.copyfile,
-             _fix_manifest=(lambda c, o: _fix_manifest(c, o)),
+             workers=1,
+             hardlink=False,
+             _build=(lambda *a: _build_tree(*a)),
+             _load_state=buildstate.BuildState.load,
              ):
-    try:
-        _mkdirs(outdir)
-    except FileExistsError:
-        pass
-    _apply_templates('extension', outdir, cfg._asdict())
-    (_update_manifest or _fix_manifest)(
-            cfg,
-            outdir,
-            )
+    # Only the outputs whose inputs changed (according to the saved
+    # build state) are regenerated, and only the ones that actually
+    # differ from what is on disk get written.
+    state = _load_state(outdir)
+    tree, inputs = _build(root, cfg, projfiles, state, hardlink)
+    written = tree.flush(outdir, workers=workers)
+    templates.CACHE.save()
+    for relpath, key in inputs.items():
+        state.record(relpath, key)
+    state.save()
+    return written
 
-    # Copy over relevant project files.
-    for name in projfiles:
-        if not name[0].isupper():
+
+def _build_tree(root, cfg, projfiles, state, hardlink=False, *,
+                _iter_templates=templates.iter_tree,
+                _render=templates.render,
+                _fix_manifest=(lambda c, t: _fix_manifest(c, t)),
+                ):
+    """Return (output tree, {relpath: inputs key}) for the stale outputs.
+
+    Nothing is written.
+    """
+    tree = outtree.OutputTree()
+    inputs = {}
+    ns = cfg._asdict()
+    nskey = buildstate.hash_ns(ns)
+    copied = [name for name in projfiles if name[0].isupper()]
+
+    # Apply the templates.
+    for relpath, source in _iter_templates('extension'):
+        if relpath in copied:
+            # The project file wins.
             continue
+        key = state.inputs_key(source, extra=[nskey])
+        if state.is_current(relpath, key):
+            continue
+        tree.add(relpath, _render(source, ns))
+        inputs[relpath] = key
+
+    # Copy over relevant project files.
+    for name in copied:
         source = os.path.join(root, name)
-        target = os.path.join(outdir, name)
-        _copy_file(source, target)
+        key = state.inputs_key(source)
+        if state.is_current(name, key):
+            continue
+        tree.add_copy(name, source, hardlink=hardlink)
+        inputs[name] = key
 
     # Apply final fixes.
-    _fix_manifest(cfg, outdir)
+    if 'package.json' in tree:
+        _fix_manifest(cfg, tree)
 
+    return tree, inputs
 
-def _fix_manifest(cfg, outdir, *,
-                  _editing=util.editing_json_file,
-                  ):
-    filename = os.path.join(outdir, 'package.json')
-    with _editing(filename) as data:
-        if cfg.author:
-            author = {
-                    'name': cfg.author.name,
-                    }
-            if cfg.author.email:
-                author['email'] = cfg.author.email
-            data['author'] = author
+
+def _fix_manifest(cfg, tree):
+    # Only "author" is loaded (and coerced), so the rest of the generated
+    # manifest is passed through as-is, without being validated.
+    manifest = Manifest.from_json(tree.read_text('package.json'), ['author'])
+    if cfg.author:
+        author = {
+                'name': cfg.author.name,
+                }
+        if cfg.author.email:
+            author['email'] = cfg.author.email
+        manifest = manifest._replace(author=author)
+    tree.add('package.json', manifest.to_json())
 
 
 def _get_project_files(root, *,
-                      _listdir=os.listdir,
+                      _scandir=os.scandir,
                       ):
+    # Only uppercase files (e.g. README.md) are copied.
     names = []
-    for name in _listdir(root):
-        if not name[0].isupper():
-            continue
-        names.append(name)
-    return names
+    with _scandir(root) as entries:
+        for entry in entries:
+            if not entry.name[0].isupper():
+                continue
+            if not entry.is_file():
+                continue
+            names.append(entry.name)
+    return sorted(names)
 
 
 def _write_license(filename, cfg, *,
                    _write_all=util.write_all,
                    _get_license=license.get_license,
                    ):
+    _write_all(filename, _license_text(cfg, _get_license=_get_license))
+
+
+def _license_text(cfg, *,
+                  _get_license=license.get_license,
+                  ):
     year = '2019'  # XXX
     author = cfg.author or 'the authors'
-    text = f'Copyright {year} {author}\n\n' + _get_license(cfg.license)
-    _write_all(filename, text)
+    return f'Copyright {year} {author}\n\n' + _get_license(cfg.license)
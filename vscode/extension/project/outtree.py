@@ -0,0 +1,232 @@
+import os
+import os.path
+
+from vscode import util
+
+
+CREATE = 'create'
+CHANGE = 'change'
+SAME = 'same'
+
+
+@util.as_namedtuple('rootdir files')
+class Plan:
+    """What flushing an output tree would do to each file.
+
+    "files" is a sorted tuple of (relpath, status), where the status is
+    one of CREATE, CHANGE, or SAME.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, rootdir, files):
+        return super(Plan, cls).__new__(
+                cls,
+                rootdir=rootdir,
+                files=tuple(sorted(files)),
+                )
+
+    def _select(self, status):
+        return [relpath for relpath, actual in self.files if actual == status]
+
+    @property
+    def created(self):
+        return self._select(CREATE)
+
+    @property
+    def changed(self):
+        return self._select(CHANGE)
+
+    @property
+    def unchanged(self):
+        return self._select(SAME)
+
+    @property
+    def has_changes(self):
+        return any(status != SAME for _, status in self.files)
+
+    def summary(self):
+        return (f'{len(self.created)} to create, '
+                f'{len(self.changed)} to change, '
+                f'{len(self.unchanged)} unchanged')
+
+
+@util.as_namedtuple('source hardlink')
+class FileCopy:
+    """An output file that is a copy of a source file."""
+
+    __slots__ = ()
+
+    def __new__(cls, source, hardlink=False):
+        return super(FileCopy, cls).__new__(
+                cls,
+                source=source,
+                hardlink=bool(hardlink),
+                )
+
+
+class OutputTree:
+    """An in-memory tree of output files.
+
+    Each file (relative to the tree's root) is either bytes or a copy
+    of some source file (which is only read if needed).  Nothing is
+    written until flush() is called, so the files may be freely
+    transformed up to then.
+    """
+
+    def __init__(self):
+        self._files = {}
+
+    def __repr__(self):
+        return f'<{type(self).__name__} ({len(self._files)} files)>'
+
+    def __len__(self):
+        return len(self._files)
+
+    def __iter__(self):
+        return iter(self._files)
+
+    def __contains__(self, relpath):
+        return relpath in self._files
+
+    def add(self, relpath, data):
+        """Set the file's contents (str or bytes)."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._files[relpath] = data
+
+    def add_copy(self, relpath, source, *, hardlink=False):
+        """Make the file a copy of the given source file.
+
+        With "hardlink", the file is linked to the source if possible
+        (see util.copy_file()).
+        """
+        self._files[relpath] = FileCopy(source, hardlink)
+
+    def remove(self, relpath):
+        del self._files[relpath]
+
+    def get(self, relpath):
+        """Return the bytes or FileCopy for the file."""
+        return self._files[relpath]
+
+    def read(self, relpath, *,
+             _open=open,
+             ):
+        """Return the file's contents as bytes."""
+        data = self._files[relpath]
+        if isinstance(data, FileCopy):
+            with _open(data.source, 'rb') as infile:
+                return infile.read()
+        return data
+
+    def read_text(self, relpath):
+        return self.read(relpath).decode('utf-8')
+
+    def dirnames(self):
+        """Return the (sorted) directories needed for the files."""
+        dirnames = set()
+        for relpath in self._files:
+            dirname = os.path.dirname(relpath)
+            while dirname and dirname not in dirnames:
+                dirnames.add(dirname)
+                dirname = os.path.dirname(dirname)
+        return sorted(dirnames)
+
+    def flush(self, rootdir, *,
+              workers=1,
+              _mkdirs=os.makedirs,
+              _is_same=None,
+              _write=None,
+              ):
+        """Write out the files that differ from what is on disk.
+
+        Return the (sorted) relative paths of the files that were
+        written.  If "workers" is not 1 then the files are compared and
+        written using a thread pool of that size (see util.run_all()).
+        """
+        is_same = _is_same or _is_same_file
+        write = _write or _write_file
+        for dirname in [''] + self.dirnames():
+            try:
+                _mkdirs(os.path.join(rootdir, dirname))
+            except FileExistsError:
+                pass
+
+        def flush_one(relpath):
+            data = self._files[relpath]
+            target = os.path.join(rootdir, relpath)
+            if is_same(data, target):
+                return False
+            write(data, target)
+            return True
+        relpaths = sorted(self._files)
+        results = util.run_all(flush_one, relpaths, workers=workers)
+        return [relpath
+                for relpath, written in zip(relpaths, results)
+                if written]
+
+    def plan(self, rootdir, *,
+             unchanged=(),
+             workers=1,
+             _plan_file=None,
+             ):
+        """Return the Plan for flushing the tree to the given dir.
+
+        Nothing is written.  Each file is checked with a stat first, and
+        the contents are only compared if the sizes match.  "unchanged"
+        is any other files (not in the tree) that are known to be up to
+        date already.
+        """
+        plan_file = _plan_file or _file_status
+
+        def plan_one(relpath):
+            target = os.path.join(rootdir, relpath)
+            return plan_file(self._files[relpath], target)
+        relpaths = sorted(self._files)
+        statuses = util.run_all(plan_one, relpaths, workers=workers)
+        files = list(zip(relpaths, statuses))
+        files.extend((relpath, SAME)
+                     for relpath in unchanged
+                     if relpath not in self._files)
+        return Plan(rootdir, files)
+
+
+def _file_status(data, target, *,
+                 _exists=os.path.exists,
+                 _is_same=None,
+                 ):
+    if not _exists(target):
+        return CREATE
+    elif (_is_same or _is_same_file)(data, target):
+        return SAME
+    else:
+        return CHANGE
+
+
+def _is_same_file(data, target, *,
+                  _stat=os.stat,
+                  _open=open,
+                  _files_match=util.files_match,
+                  ):
+    if isinstance(data, FileCopy):
+        return _files_match(data.source, target)
+    try:
+        st = _stat(target)
+    except FileNotFoundError:
+        return False
+    if len(data) != st.st_size:
+        return False
+    with _open(target, 'rb') as infile:
+        return infile.read() == data
+
+
+def _write_file(data, target, *,
+                _open=open,
+                _copy_file=util.copy_file,
+                ):
+    if isinstance(data, FileCopy):
+        _copy_file(data.source, target, hardlink=data.hardlink)
+    else:
+        with _open(target, 'wb') as outfile:
+            outfile.write(data)
@@ -1,12 +1,16 @@
+import hashlib
+import json
 import os
 import os.path
 import re
+import string
+import threading
 
 from vscode import util
 from . import TEMPLATES_DIR
 
 
-UNESCAPED_RE = re.compile('''
+UNESCAPED_RE = util.lazy_compile_regex('''
         (?:
           (?: ^ | [^{] )
           [{]
@@ -25,42 +29,254 @@ def resolve(kind, *path):
     return os.path.join(TEMPLATES_DIR, kind, *path)
 
 
-def apply_to_tree(kind, rootdir, ns, *,
-                  _walk=os.walk,
-                  _mkdirs=os.makedirs,
-                  _read_all=util.read_all,
-                  _write_all=util.write_all,
-                  ):
-    """Apply the given namespace to all templates for the specified kind."""
+def iter_tree(kind, *,
+              _walk=os.walk,
+              ):
+    """Yield (relpath, filename) for each template of the given kind."""
     templates = resolve(kind)
-    for root, subdirs, files in _walk(templates):
+    for root, _, files in _walk(templates):
         relroot = root[len(templates):].lstrip(os.path.sep)
-        for name in subdirs:
-            dirname = os.path.join(rootdir, relroot, name)
-            #logger.info(f'creating project subdirectory at {dirname!r}')
-            try:
-                _mkdirs(dirname)
-            except FileExistsError:
-                pass
         for name in files:
             if name.startswith('.') and name.endswith('.swp'):  # vim
                 continue
-            source = os.path.join(root, name)
-            target = os.path.join(rootdir, relroot, name)
-            #logger.info(f'applying project template at {target!r}')
-            template = _read_all(source)
-            text = '\n'.join(
-                    _apply_lines(source, template, ns))
-            _write_all(target, text)
+            yield os.path.join(relroot, name), os.path.join(root, name)
+
 
+def render(filename, ns, *,
+           _cache=None,
+           ):
+    """Return the text of the template file, with the namespace applied."""
+    template = (_cache or CACHE).get(filename)
+    return template.render(ns)
+
+
+def apply_to_tree(kind, rootdir, ns, *,
+                  workers=1,
+                  _iter_tree=iter_tree,
+                  _mkdirs=os.makedirs,
+                  _write_all=util.write_all,
+                  _cache=None,
+                  ):
+    """Apply the given namespace to all templates for the specified kind.
 
-def _apply_lines(filename, template, ns):
-    for line in template.splitlines():
+    If "workers" is not 1 then the files are rendered and written
+    using a thread pool of that size (None means the default size).
+    Either way, the directories are all created up front and any
+    failures are reported together (in template order).
+    """
+    cache = _cache or CACHE
+    # Plan it out.
+    plan = sorted(_iter_tree(kind))
+    dirnames = {rootdir}
+    for relpath, _ in plan:
+        dirname = os.path.dirname(os.path.join(rootdir, relpath))
+        while dirname not in dirnames:
+            dirnames.add(dirname)
+            dirname = os.path.dirname(dirname)
+    for dirname in sorted(dirnames):
+        #logger.info(f'creating project subdirectory at {dirname!r}')
         try:
-            yield line.format(**ns)
-        except Exception as exc:
-            msg = (f'problem applying template file {filename!r} '
-                   f'({type(exc).__name__}: {exc})')
-            if type(exc) is ValueError and UNESCAPED_RE.search(line):
-                msg += ' (try escaping the bracket in the template)'
-            raise Exception(msg)
+            _mkdirs(dirname)
+        except FileExistsError:
+            pass
+
+    # Do the work.
+    def apply(item):
+        relpath, source = item
+        target = os.path.join(rootdir, relpath)
+        #logger.info(f'applying project template at {target!r}')
+        _write_all(target, render(source, ns, _cache=cache))
+    try:
+        util.run_all(apply, plan, workers=workers)
+    finally:
+        cache.save()
+
+
+def _error(filename, lineno, exc, line=None):
+    where = f' (line {lineno})' if lineno else ''
+    msg = (f'problem applying template file {filename!r}{where} '
+           f'({type(exc).__name__}: {exc})')
+    if type(exc) is ValueError and line and UNESCAPED_RE.search(line):
+        msg += ' (try escaping the bracket in the template)'
+    return Exception(msg)
+
+
+##################################
+# compiled templates
+
+_FORMATTER = string.Formatter()
+
+
+@util.as_namedtuple('filename segments')
+class Template:
+    """A template, parsed into literal text and replacement fields.
+
+    Each segment is (literal, field, spec, conversion, lineno), where
+    "field" is None if there is only literal text.  Rendering is then
+    a single join, with no re-parsing.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def parse(cls, text, filename=None):
+        """Return the compiled template for the given text.
+
+        A ValueError (e.g. from an unescaped bracket) is re-raised with
+        the offending line.
+        """
+        segments = []
+        lineno = 1
+        try:
+            for literal, field, spec, conv in _FORMATTER.parse(text):
+                lineno += literal.count('\n')
+                segments.append((literal, field, spec, conv, lineno))
+        except ValueError as exc:
+            # Find the line that is the problem.
+            for lineno, line in enumerate(text.splitlines(), 1):
+                try:
+                    for _ in _FORMATTER.parse(line):
+                        pass
+                except ValueError as exc:
+                    raise _error(filename, lineno, exc, line)
+            raise _error(filename, None, exc)
+        return cls(filename, tuple(segments))
+
+    def render(self, ns):
+        """Return the text with the namespace applied."""
+        parts = []
+        for literal, field, spec, conv, lineno in self.segments:
+            parts.append(literal)
+            if field is None:
+                continue
+            try:
+                if field in ns:
+                    value = ns[field]
+                else:
+                    value, _ = _FORMATTER.get_field(field, (), ns)
+                if conv:
+                    value = _FORMATTER.convert_field(value, conv)
+                if spec and '{' in spec:
+                    spec = spec.format(**ns)
+                parts.append(format(value, spec))
+            except Exception as exc:
+                raise _error(self.filename, lineno, exc)
+        return ''.join(parts)
+
+
+CACHE_VERSION = 1
+
+
+def _default_cache_file(*,
+                        _getenv=os.environ.get,
+                        _expand_user=os.path.expanduser,
+                        ):
+    cachedir = _getenv('XDG_CACHE_HOME') or _expand_user('~/.cache')
+    return os.path.join(cachedir, 'py-vscode-extensions', 'templates.json')
+
+
+class TemplateCache:
+    """Compiled templates, kept in memory and (optionally) on disk.
+
+    Each entry is keyed by the template's (size, mtime).  If those
+    don't match but the content hash does then the compiled template is
+    still reused.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self._entries = None  # {source: [size, mtime, hash, segments]}
+        self._templates = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.filename!r})'
+
+    def _load(self, *,
+              _read_all=util.read_all,
+              ):
+        entries = {}
+        if self.filename:
+            try:
+                data = json.loads(_read_all(self.filename))
+            except (OSError, ValueError):
+                data = None
+            if isinstance(data, dict) and data.get('version') == CACHE_VERSION:
+                entries = data.get('templates') or {}
+        self._entries = entries
+        return entries
+
+    def get(self, source, *,
+            _stat=os.stat,
+            _open=open,
+            ):
+        """Return the compiled template for the given file."""
+        entries = self._entries
+        if entries is None:
+            with self._lock:
+                entries = self._entries
+                if entries is None:
+                    entries = self._load()
+        st = _stat(source)
+        entry = entries.get(source)
+        if entry and entry[:2] == [st.st_size, st.st_mtime_ns]:
+            template = self._templates.get(source)
+            if template is None:
+                template = self._from_entry(source, entry)
+            return template
+
+        with _open(source, 'rb') as infile:
+            data = infile.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry[2] == digest:
+            template = self._templates.get(source)
+            if template is None:
+                template = self._from_entry(source, entry)
+        else:
+            template = Template.parse(data.decode('utf-8'), source)
+        entry = [st.st_size, st.st_mtime_ns, digest,
+                 [list(s) for s in template.segments]]
+        with self._lock:
+            entries[source] = entry
+            self._templates[source] = template
+            self._dirty = True
+        return template
+
+    def _from_entry(self, source, entry):
+        template = Template(source, tuple(tuple(s) for s in entry[3]))
+        self._templates[source] = template
+        return template
+
+    def save(self, *,
+             _mkdirs=os.makedirs,
+             _write_all=util.write_all,
+             _replace=os.replace,
+             ):
+        """Write the cache out, if it changed (and has a filename).
+
+        This is safe to call from multiple threads (and processes).
+        """
+        with self._lock:
+            if not self._dirty or not self.filename:
+                return False
+            text = json.dumps({
+                    'version': CACHE_VERSION,
+                    'templates': self._entries,
+                    })
+            tmp = f'{self.filename}.{os.getpid()}.tmp'
+            try:
+                try:
+                    _mkdirs(os.path.dirname(self.filename))
+                except FileExistsError:
+                    pass
+                _write_all(tmp, text)
+                _replace(tmp, self.filename)
+            except OSError:
+                # The cache is only an optimization.
+                return False
+            self._dirty = False
+            return True
+
+
+CACHE = TemplateCache(_default_cache_file())
@@ -0,0 +1,212 @@
+import logging
+import os
+import os.path
+import select
+import struct
+import sys
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+DEBOUNCE = 0.2  # seconds
+POLL_INTERVAL = 0.5  # seconds
+
+
+def new_watcher(dirnames, *, poll=False):
+    """Return a watcher for the given {dirname: recursive} mapping.
+
+    inotify is used where available, falling back to stat polling.
+    """
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(dirnames)
+        except OSError as exc:
+            logger.debug(f'inotify not available ({exc}), polling instead')
+    return PollingWatcher(dirnames)
+
+
+def _iter_tree(dirname, recursive):
+    """Yield (dirname, [filename]) for the directory (and subdirs)."""
+    for root, subdirs, files in os.walk(dirname):
+        yield root, [os.path.join(root, name) for name in files]
+        if not recursive:
+            break
+
+
+class PollingWatcher:
+    """Watches directories by periodically stat'ing every file."""
+
+    def __init__(self, dirnames, *,
+                 interval=POLL_INTERVAL,
+                 ):
+        self.dirnames = dict(dirnames)
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.dirnames!r})'
+
+    def _take_snapshot(self, *,
+                       _stat=os.stat,
+                       ):
+        snapshot = {}
+        for dirname, recursive in self.dirnames.items():
+            for _, filenames in _iter_tree(dirname, recursive):
+                for filename in filenames:
+                    try:
+                        st = _stat(filename)
+                    except FileNotFoundError:
+                        continue
+                    snapshot[filename] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout=None, *,
+             _sleep=time.sleep,
+             _monotonic=time.monotonic,
+             ):
+        """Return the set of changed files (empty if timed out)."""
+        end = None if timeout is None else _monotonic() + timeout
+        while True:
+            snapshot = self._take_snapshot()
+            old = self._snapshot
+            self._snapshot = snapshot
+            changed = {filename
+                       for filename in old.keys() | snapshot.keys()
+                       if old.get(filename) != snapshot.get(filename)}
+            if changed:
+                return changed
+            if end is not None:
+                remaining = end - _monotonic()
+                if remaining <= 0:
+                    return changed
+                _sleep(min(self.interval, remaining))
+            else:
+                _sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Watches directories using the Linux inotify API (via ctypes)."""
+
+    # See inotify(7).
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_ISDIR = 0x40000000
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+            | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, dirnames):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                           use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            init = libc.inotify_init1
+        except AttributeError:
+            raise OSError('inotify not supported')
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p,
+                                    ctypes.c_uint32)
+        self._ctypes = ctypes
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.dirnames = dict(dirnames)
+        self._watches = {}  # {wd: (dirname, recursive)}
+        for dirname, recursive in self.dirnames.items():
+            self._watch_tree(dirname, recursive)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.dirnames!r})'
+
+    def _watch_tree(self, dirname, recursive):
+        for root, _ in _iter_tree(dirname, recursive):
+            wd = self._add_watch(self.fd, os.fsencode(root), self.MASK)
+            if wd < 0:
+                errno = self._ctypes.get_errno()
+                raise OSError(errno, os.strerror(errno), root)
+            self._watches[wd] = (root, recursive)
+
+    def _read_events(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, size = self.EVENT.unpack_from(data, pos)
+            pos += self.EVENT.size
+            name = os.fsdecode(data[pos:pos+size].rstrip(b'\0'))
+            pos += size
+            yield wd, mask, name
+
+    def wait(self, timeout=None, *,
+             _select=select.select,
+             ):
+        """Return the set of changed files (empty if timed out)."""
+        changed = set()
+        ready, _, _ = _select([self.fd], [], [], timeout)
+        if not ready:
+            return changed
+        for wd, mask, name in self._read_events():
+            try:
+                dirname, recursive = self._watches[wd]
+            except KeyError:
+                continue
+            if not name:
+                continue
+            filename = os.path.join(dirname, name)
+            if mask & self.IN_ISDIR:
+                if recursive and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    try:
+                        self._watch_tree(filename, recursive)
+                    except OSError:
+                        pass  # It went away already.
+                continue
+            changed.add(filename)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def watch(dirnames, on_change, *,
+          debounce=DEBOUNCE,
+          poll=False,
+          _new_watcher=new_watcher,
+          ):
+    """Call on_change(changed) each time any of the files change.
+
+    "dirnames" maps each directory to watch to whether or not to watch
+    it recursively.  Bursts of events (e.g. an editor's save) are
+    collapsed into a single call, once nothing changed for "debounce"
+    seconds.  This runs until interrupted.
+    """
+    watcher = _new_watcher(dirnames, poll=poll)
+    logger.debug(f'watching with {watcher!r}')
+    try:
+        while True:
+            changed = watcher.wait(None)
+            while True:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            if changed:
+                on_change(changed)
+    finally:
+        watcher.close()
@@ -0,0 +1,137 @@
+import concurrent.futures
+import json
+from multiprocessing.reduction import ForkingPickler
+import os
+import os.path
+import types
+
+from vscode import util
+from .manifest import Manifest
+
+
+MANIFEST = 'package.json'
+IDENTITY = ('name', 'publisher', 'version', 'engines')
+
+
+# Manifests parsed in worker processes are sent back pickled, and some
+# of their (coerced) values are read-only mappings.
+def _new_readonly_mapping(data):
+    return types.MappingProxyType(data)
+
+ForkingPickler.register(types.MappingProxyType,
+                        (lambda proxy: (_new_readonly_mapping, (dict(proxy),))))
+
+
+@util.as_namedtuple('dirname manifest error')
+class ScanResult:
+    """The result of reading a single installed extension's manifest.
+
+    Exactly one of "manifest" and "error" is set.
+    """
+
+    __slots__ = ()
+
+    @property
+    def filename(self):
+        return os.path.join(self.dirname, MANIFEST)
+
+    @property
+    def id(self):
+        if self.manifest is None:
+            return None
+        return f'{self.manifest.publisher}.{self.manifest.name}'
+
+
+def iter_extension_dirs(root, *,
+                        _scandir=os.scandir,
+                        ):
+    """Yield the directory of each extension in the given directory.
+
+    Each subdirectory (e.g. of ~/.vscode/extensions) is assumed to hold
+    one extension.  Hidden directories are skipped.
+    """
+    with _scandir(root) as entries:
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                yield entry.path
+
+
+def read_manifest(dirname, fields=None, *,
+                  _read_all=util.read_all,
+                  _load_fields=util.load_json_fields,
+                  _loads=json.loads,
+                  ):
+    """Return the decoded package.json data for the given extension.
+
+    If "fields" is provided then only those fields are decoded.
+    """
+    text = _read_all(os.path.join(dirname, MANIFEST))
+    if fields is None:
+        return _loads(text)
+    return _load_fields(text, fields)
+
+
+def load_manifest(dirname, fields=None, *,
+                  _read=read_manifest,
+                  _from_data=Manifest.from_data,
+                  ):
+    """Return the Manifest for the given extension.
+
+    See read_manifest() about "fields".
+    """
+    return _from_data(_read(dirname, fields), fields)
+
+
+def scan(root, fields=IDENTITY, *,
+         workers=None,
+         processes=False,
+         _iter_dirs=iter_extension_dirs,
+         _load=load_manifest,
+         ):
+    """Yield a ScanResult for each extension in the given directory.
+
+    The manifests are read, decoded, and parsed in a pool of threads (or
+    processes, if "processes" is true) and the results are yielded as
+    they complete, so the order is not guaranteed.  Problems with an
+    extension are reported in its result rather than raised.
+
+    Only the given fields of each manifest are loaded.  Pass None to
+    load the whole manifest.
+    """
+    if fields is not None:
+        fields = tuple(fields)
+    if processes:
+        pool = concurrent.futures.ProcessPoolExecutor(workers)
+    else:
+        pool = concurrent.futures.ThreadPoolExecutor(workers)
+    # We don't use "with pool:" since that would wait for any pending
+    # reads if the caller stops iterating early.
+    try:
+        pending = {pool.submit(_load, dirname, fields): dirname
+                   for dirname in _iter_dirs(root)}
+        for fut in concurrent.futures.as_completed(pending):
+            dirname = pending.pop(fut)
+            try:
+                manifest = fut.result()
+            except Exception as exc:
+                yield ScanResult(dirname, None, f'{type(exc).__name__}: {exc}')
+            else:
+                yield ScanResult(dirname, manifest, None)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def scan_all(root, fields=IDENTITY, **kwargs):
+    """Return (results, failures) for the extensions in the directory.
+
+    Both are lists of ScanResult, sorted by directory.
+    """
+    results = []
+    failures = []
+    for result in scan(root, fields, **kwargs):
+        (failures if result.error else results).append(result)
+    results.sort()
+    failures.sort()
+    return results, failures
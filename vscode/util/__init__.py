@@ -1,50 +1,88 @@
-# Pull in exported names.
-from .os import (
-        cwd,
-        run_cmd,
-        resolve as resolve_filename,
-        read_all,
-        write_all,
-        )
-from .classtools import (
-        Slot,
-        HasRawFactory,
-        classonly,
-        as_namedtuple,
-        )
-from .coercion import (
-        as_str,
-        as_int,
-        iter_sequence,
-        iter_mapping,
-        as_sequence,
-        as_readonly_sequence,
-        as_mapping,
-        as_readonly_mapping,
-        )
-from .git import (
-        get_config as get_git_config,
-        get_committer as get_git_committer,
-        get_repo_url as get_git_repo_url,
-        )
-from .regex import (
-        match as match_regex,
-        )
-from .json import (
-        editing_file as editing_json_file,
-        )
-from .validation import (
-        validate,
-        validate_sequence,
-        validator,
-        )
-from ._person import (
-        parse_person,
-        Person,
-        )
-from .version import (
-        SimpleVersion,
-        Version,
-        SemVer,
-        VersionSpec,
-        )
+import importlib
+
+
+# Exported names are pulled in lazily (see __getattr__() below), so
+# importing vscode.util (e.g. for a CLI) does not pay for every
+# submodule up front.
+_EXPORTS = {
+    '.os': {
+        'cwd': 'cwd',
+        'run_cmd': 'run_cmd',
+        'resolve_filename': 'resolve',
+        'read_all': 'read_all',
+        'write_all': 'write_all',
+        'files_match': 'files_match',
+        'copy_file': 'copy_file',
+        },
+    '.classtools': {
+        'Slot': 'Slot',
+        'HasRawFactory': 'HasRawFactory',
+        'classonly': 'classonly',
+        'as_namedtuple': 'as_namedtuple',
+        },
+    '.coercion': {
+        'as_str': 'as_str',
+        'as_int': 'as_int',
+        'iter_sequence': 'iter_sequence',
+        'iter_mapping': 'iter_mapping',
+        'as_sequence': 'as_sequence',
+        'as_readonly_sequence': 'as_readonly_sequence',
+        'as_mapping': 'as_mapping',
+        'as_readonly_mapping': 'as_readonly_mapping',
+        },
+    '.git': {
+        'get_git_config': 'get_config',
+        'get_git_committer': 'get_committer',
+        'get_git_repo_url': 'get_repo_url',
+        },
+    '.parallel': {
+        'run_all': 'run_all',
+        'ParallelError': 'ParallelError',
+        },
+    '.regex': {
+        'match_regex': 'match',
+        'lazy_compile_regex': 'lazy_compile',
+        },
+    '.json': {
+        'editing_json_file': 'editing_file',
+        'load_json_fields': 'load_fields',
+        },
+    '.validation': {
+        'validate': 'validate',
+        'validate_sequence': 'validate_sequence',
+        'validator': 'validator',
+        'register_validation_kind': 'register_kind',
+        'iter_validation_errors': 'iter_errors',
+        'Diagnostic': 'Diagnostic',
+        },
+    '._person': {
+        'parse_person': 'parse_person',
+        'Person': 'Person',
+        },
+    '.version': {
+        'SimpleVersion': 'SimpleVersion',
+        'Version': 'Version',
+        'SemVer': 'SemVer',
+        'VersionSpec': 'VersionSpec',
+        },
+    }
+_LOOKUP = {name: (modname, attr)
+           for modname, names in _EXPORTS.items()
+           for name, attr in names.items()}
+
+__all__ = list(_LOOKUP)
+
+
+def __getattr__(name):
+    try:
+        modname, attr = _LOOKUP[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module = importlib.import_module(modname, __name__)
+    value = getattr(module, attr)
+    globals()[name] = value  # Only look it up once.
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LOOKUP))
@@ -13,6 +13,7 @@ PERSON = rf'''
             (?: ({EMAIL}) | ([^>\s]+) )
             [>]
             )?
+          \s*
           (?:
             [(]
             (?: ({URL}) | ([^)\s]+) )
@@ -33,7 +34,7 @@ def parse_person(text):
         return None
     name, email, _email, url, _url = m.groups()
     return (
-            name,
+            name.strip(),
             email or _email or None,
             url or _url or None,
             )
@@ -45,6 +46,12 @@ class Person:
 
     __slots__ = ('_raw',)
 
+    _COLUMN_KINDS = {
+            'name': (lambda v: as_str(v) or None),
+            'email': (lambda v: as_str(v) or None),
+            'url': (lambda v: as_str(v) or None),
+            }
+
     @classmethod
     def from_raw(cls, raw):
         if isinstance(raw, str):
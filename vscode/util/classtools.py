@@ -20,7 +20,9 @@ class classonly:
         return f'{type(self).__name__}(obj={self.obj!r})'
 
     def __set_name__(self, cls, name):
-        if self.name is not None:
+        # as_namedtuple() re-creates the class, so we allow re-binding
+        # under the same name.
+        if self.name is not None and self.name != name:
             raise TypeError('already used')
         self.name = name
 
@@ -48,30 +50,57 @@ class HasRawFactory:
     def from_raw(cls, raw):
         if not raw:
             return None
-        elif isinstance(raw, cls):
-            return raw
-        elif isinstance(raw, str):
-            return cls.from_string(raw)
-        elif hasattr(type(raw), '__next__'):
-            return cls.from_iterator(raw)
+        try:
+            factory = _RAW_FACTORIES[cls, type(raw)]
+        except KeyError:
+            factory = _RAW_FACTORIES[cls, type(raw)] = \
+                    cls._resolve_raw_factory(type(raw))
+        return factory(raw)
+
+    @classonly
+    def _resolve_raw_factory(cls, rawtype):
+        """Return the function from_raw() should use for the given type.
+
+        This is called (at most) once for each type a class sees.
+        """
+        if issubclass(rawtype, cls):
+            return (lambda raw: raw)
+        elif issubclass(rawtype, str):
+            return cls.from_string
+        elif hasattr(rawtype, '__next__'):
+            return cls.from_iterator
+
+        argnames = getattr(cls, '_ARG_NAMES', None)
+        if argnames is None:
+            argnames = getattr(cls, '_fields', None)
+        from_mapping = cls._from_mapping
+        from_sequence = cls._from_sequence
+        if hasattr(rawtype, 'items'):
+            def factory(raw):
+                self = from_mapping(raw, argnames)
+                if self is None:
+                    self = from_sequence(raw, argnames)
+                    if self is None:
+                        raise UnsupportedTypeError(raw)
+                return self
         else:
-            argnames = getattr(cls, '_ARG_NAMES', None)
-            if argnames is None:
-                argnames = getattr(cls, '_fields', None)
-            self = cls._from_mapping(raw, argnames)
-            if self is not None:
+            def factory(raw):
+                self = from_sequence(raw, argnames)
+                if self is None:
+                    raise UnsupportedTypeError(raw)
                 return self
-            else:
-                self = cls._from_sequence(raw, argnames)
-                if self is not None:
-                    return self
-                raise UnsupportedTypeError(raw)
+        return factory
 
     @classonly
     def from_string(cls, value):
         """Return a new instance based on the given string."""
         raise NotImplementedError
 
+    @classonly
+    def from_iterator(cls, value):
+        """Return a new instance based on the given iterator."""
+        return cls.from_raw(tuple(value))
+
     @classonly
     def mapping_to_kwargs(cls, value, argnames):
         if not hasattr(value, 'items'):
@@ -84,7 +113,7 @@ class HasRawFactory:
 
     @classonly
     def _from_mapping(cls, value, argnames):
-        kwargs = cls.mapping_to_kwargs(raw, argnames)
+        kwargs = cls.mapping_to_kwargs(value, argnames)
         if kwargs is None:
             return None
 
@@ -113,22 +142,32 @@ class HasRawFactory:
             return cls(*args)
         except TypeError:
             try:
-                tuple(*args)
+                tuple(args)
             except TypeError:
                 return None
             failed = (value, args)
-            if len(args) != len(argnames):
+            if argnames is not None and len(args) != len(argnames):
                 raise FieldsMismatchError(failed)
             raise  # re-raise
 
 
+# {(cls, type(raw)): factory}
+_RAW_FACTORIES = {}
+
+
 ##################################
 # slots
 
 class Slot:
-    """A descriptor that provides a slot."""
+    """A descriptor that provides a slot.
 
-    __slots__ = ('initial', 'default', 'readonly', 'instances', 'name')
+    The value is kept in the instance's __dict__ rather than in a table
+    on the descriptor, so it is freed along with the object.  (Tuple
+    subclasses support neither non-empty __slots__ nor weakrefs, but
+    they do support __dict__.)
+    """
+
+    __slots__ = ('initial', 'default', 'readonly', 'name')
 
     def __init__(self, initial=_NOT_SET, *,
                  default=_NOT_SET,
@@ -138,22 +177,25 @@ class Slot:
         self.default = default
         self.readonly = readonly
 
-        self.instances = {}
         self.name = None
 
     def __set_name__(self, cls, name):
-        if self.name is not None:
+        # as_namedtuple() re-creates the class, so we allow re-binding
+        # under the same name.
+        if self.name is not None and self.name != name:
             raise TypeError('already used')
         self.name = name
 
     def __get__(self, obj, cls):
         if obj is None:  # called on the class
             return self
+        ns = _get_storage(obj, self.name)
         try:
-            value = self.instances[id(obj)]
+            value = ns[self.name]
         except KeyError:
             value = self.default if self.initial is _NOT_SET else self.initial
-            self.instances[id(obj)] = value
+            if value is not _NOT_SET:
+                ns[self.name] = value
         if value is _NOT_SET:
             raise AttributeError(self.name)
         return value
@@ -161,26 +203,45 @@ class Slot:
     def __set__(self, obj, value):
         if self.readonly:
             raise AttributeError(f'{self.name} is readonly')
-        self.instances[id(obj)] = value
+        _get_storage(obj, self.name)[self.name] = value
 
     def __delete__(self, obj):
         if self.readonly:
             raise AttributeError(f'{self.name} is readonly')
-        self.instances[id(obj)] = self.default
+        ns = _get_storage(obj, self.name)
+        if self.default is _NOT_SET:
+            ns.pop(self.name, None)
+        else:
+            ns[self.name] = self.default
+
+
+def _get_storage(obj, name):
+    try:
+        return obj.__dict__
+    except AttributeError:
+        raise TypeError(f'{type(obj).__name__} objects have no __dict__ '
+                        f'(needed for slot {name!r})')
 
 
 def set_slots(cls, *names, **defaults):
     """Set pseudo-slots on the given class (in lieu of __slots__.
 
-    The slots are added to the class as descriptors.
+    The slots are added to the class as descriptors.  Instances must
+    have a __dict__, where the values are stored.
 
     This is espcially useful for subclasses of types that do not support
     slots (like tuple).
     """
     for name in names:
-        setattr(cls, name, Slot())
+        _add_slot(cls, name, Slot())
     for name, default in defaults.items():
-        setattr(cls, name, Slot(default=default))
+        _add_slot(cls, name, Slot(default=default))
+
+
+def _add_slot(cls, name, slot):
+    # setattr() does not call __set_name__().
+    slot.__set_name__(cls, name)
+    setattr(cls, name, slot)
 
 
 def slots(*names, **defaults):
@@ -192,40 +253,31 @@ def slots(*names, **defaults):
 
 
 def _new_slots_base(slots):
-    # The state is stored here in a closure.
-    instslots = {n: {} for n in slots}
+    # The values are stored in each instance's __dict__ (so they go
+    # away with the instance); this only restricts the allowed names.
+    slots = frozenset(slots)
     class _SlotsBase:
         __slots__ = ()
-        def __getattr__(self, name):
-            # XXX super?
-            try:
-                return instslots[name][id(self)]
-            except KeyError:
-                raise AttributeError(name)
         def __setattr__(self, name, value):
-            # XXX super?
-            try:
-                insts = instslots[name]
-            except KeyError:
+            if name not in slots:
                 raise AttributeError(name)
-            insts[id(self)] = value
+            super().__setattr__(name, value)
         def __delattr__(self, name):
-            # XXX super?
-            try:
-                insts = instslots[name]
-                del insts[id(self)]
-            except KeyError:
+            if name not in slots:
                 raise AttributeError(name)
+            super().__delattr__(name)
     return _SlotsBase
 
 
 def _fix_slots(ns, bases=None, slots=()):
     __slots__ = ns.get('__slots__')
-    if slots and ns.__slots__:
+    if slots and __slots__:
         raise TypeError('got unexpected __slots__')
     slots = slots or __slots__
     if slots:  # not allowed on tuple subclasses
-        ns['__slots__'] = ()
+        # Leaving out __slots__ gives each instance a __dict__, which is
+        # where the pseudo-slots keep their values.
+        ns.pop('__slots__', None)
         if bases is None:
             for name in slots:
                 # XXX Make sure it is actually a descriptor?
@@ -270,6 +322,9 @@ def as_namedtuple(*fields, extras=True):
         # If any decorators with side effects (e.g. registration) were
         # already applied then the following is problematic.
         ns = dict(vars(cls))
+        # These belong to the original class.
+        ns.pop('__dict__', None)
+        ns.pop('__weakref__', None)
         _fix_slots(ns)
         NT = meta(cls.__name__, bases, ns)
         #NT = meta(cls.__name__, (cls,) + bases, ns)
@@ -324,6 +379,67 @@ class _NTExtras(HasRawFactory):
 
     __slots__ = ()
 
+    # {field: coerce} for from_columns().  If not set then each row
+    # goes through __new__().  Classes should only set this if their
+    # __new__() does nothing more than coerce each field.
+    _COLUMN_KINDS = None
+
+    @classmethod
+    def from_columns(cls, **columns):
+        """Return a list of new instances, one for each row.
+
+        Each column is a sequence of raw values for one field.  If the
+        class supports it (see _COLUMN_KINDS) then each column is coerced
+        all at once and the instances are created without calling
+        __new__().  Otherwise, or if any column is missing, each row goes
+        through __new__() (so missing fields get its defaults, or it
+        raises TypeError).
+        """
+        if not columns:
+            return []
+        columns = {name: list(values) for name, values in columns.items()}
+        numrows = len(next(iter(columns.values())))
+        for name, values in columns.items():
+            if len(values) != numrows:
+                raise ValueError(f'({name}) expected {numrows} values, '
+                                 f'got {len(values)}')
+
+        kinds = cls._COLUMN_KINDS
+        if (kinds is None or not columns.keys() <= kinds.keys()
+                or len(columns) != len(cls._fields)):
+            names = list(columns)
+            return [cls(**dict(zip(names, row)))
+                    for row in zip(*columns.values())]
+
+        coerced = []
+        for name in cls._fields:
+            values = columns[name]
+            coerce = kinds.get(name)
+            if coerce is not None:
+                try:
+                    values = list(map(coerce, values))
+                except (TypeError, ValueError) as exc:
+                    raise ValueError(f'({name}) {exc}')
+            coerced.append(values)
+        new = tuple.__new__
+        return [new(cls, row) for row in zip(*coerced)]
+
+    @classmethod
+    def _make_many(cls, rows):
+        """Return a list of new instances, one for each row.
+
+        Each row is a sequence of raw values, as with _make().
+        """
+        rows = [tuple(row) for row in rows]
+        if not rows:
+            return []
+        # Anything but full rows goes through _make(), so it fails the
+        # same way (rather than filling in None for missing values).
+        numfields = len(cls._fields)
+        if any(len(row) != numfields for row in rows):
+            return [cls._make(row) for row in rows]
+        return cls.from_columns(**dict(zip(cls._fields, zip(*rows))))
+
     # XXX Always validate?
     #def __init__(self, *args, **kwargs):
     #    self.validate()
@@ -1,3 +1,4 @@
+from collections.abc import Mapping, Sequence
 import types
 
 
@@ -55,12 +56,17 @@ def as_sequence(raw, *, item=None, cls=list):
             iter_sequence(raw, item=item))
 
 
-def as_readonly_sequence(raw, *, item=None):
+def as_readonly_sequence(raw, *, item=None, lazy=False):
     """Return a coerced sequence for the given raw value.
 
     The returned container type is not guaranteed.  The only guarantee
     is that it will be read-only.
+
+    If "lazy" is true then each item is coerced when first accessed
+    (see LazySequence).
     """
+    if lazy:
+        return LazySequence(raw, item=item)
     return as_sequence(raw, item=item, cls=tuple)
 
 
@@ -70,11 +76,129 @@ def as_mapping(raw, *, key=None, value=None, cls=dict):
             iter_mapping(raw, key=key, value=value))
 
 
-def as_readonly_mapping(raw, *, key=None, value=None, cls=dict):
+def as_readonly_mapping(raw, *, key=None, value=None, cls=dict,
+                        lazy=False):
     """Return a coerced mapping for the given raw value.
 
     The returned container type is not guaranteed.  The only guarantee
     is that it will be read-only.
+
+    If "lazy" is true then each value is coerced when first accessed
+    (see LazyMapping).
     """
+    if lazy:
+        return LazyMapping(raw, key=key, value=value)
     return types.MappingProxyType(
         as_mapping(raw, key=key, value=value))
+
+
+##################################
+# lazy views
+
+_NOT_SET = object()
+
+
+class LazySequence(Sequence):
+    """A read-only sequence that coerces each item on first access.
+
+    The coerced items are memoized.  Use validate() to coerce all of
+    them up front.
+    """
+
+    __slots__ = ('_raw', '_item', '_items')
+
+    def __init__(self, raw, *, item=None):
+        self._raw = tuple(raw)
+        self._item = item
+        self._items = [_NOT_SET] * len(self._raw) if item else None
+
+    def __repr__(self):
+        return f'{type(self).__name__}({tuple(self)!r})'
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        if self._items is None:
+            return self._raw[index]
+        value = self._items[index]
+        if value is _NOT_SET:
+            try:
+                value = self._item(self._raw[index])
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f'(item {index}) {exc}')
+            self._items[index] = value
+        return value
+
+    def __eq__(self, other):
+        if not isinstance(other, (tuple, LazySequence)):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def validate(self):
+        """Coerce every item (raising ValueError for the first failure)."""
+        for _ in self:
+            pass
+
+
+class LazyMapping(Mapping):
+    """A read-only mapping that coerces each value on first access.
+
+    The keys are all coerced together (when first needed) while the
+    values are coerced one at a time.  Both are memoized.  Use
+    validate() to coerce everything up front.
+    """
+
+    __slots__ = ('_raw', '_key', '_value', '_keys', '_values')
+
+    def __init__(self, raw, *, key=None, value=None):
+        self._raw = dict(raw)
+        self._key = key
+        self._value = value
+        self._keys = None  # {coerced: raw}
+        self._values = {}
+
+    def __repr__(self):
+        return f'{type(self).__name__}({dict(self)!r})'
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __iter__(self):
+        return iter(self._get_keys())
+
+    def __contains__(self, key):
+        return key in self._get_keys()
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        rawkey = self._get_keys()[key]
+        value = self._raw[rawkey]
+        if self._value is not None:
+            try:
+                value = self._value(value)
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f'({key}) {exc}')
+        self._values[key] = value
+        return value
+
+    def _get_keys(self):
+        if self._keys is None:
+            if self._key is None:
+                self._keys = {k: k for k in self._raw}
+            else:
+                self._keys = {self._key(k): k for k in self._raw}
+        return self._keys
+
+    def validate(self):
+        """Coerce every item (raising ValueError for the first failure)."""
+        for key in self:
+            self[key]
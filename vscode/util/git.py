@@ -5,12 +5,13 @@ import shutil
 import subprocess
 
 from .os import run_cmd
+from .regex import lazy_compile
 
 
 CONFIG = os.path.join('~', '.gitconfig')
-GIT = shutil.which('git')
+GIT = None  # Looked up on first use.
 
-REMOTE_RE = re.compile(rf'''
+REMOTE_RE = lazy_compile(rf'''
     ^
     (\S+)  # <name>
     \s+
@@ -47,6 +48,9 @@ REMOTE_RE = re.compile(rf'''
 
 
 def _git(*args, root='.'):
+    global GIT
+    if GIT is None:
+        GIT = shutil.which('git')
     argv = [GIT, *args]
     try:
         return run_cmd(argv)
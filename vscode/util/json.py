@@ -1,5 +1,6 @@
 import contextlib
 import json
+import re
 
 
 @contextlib.contextmanager
@@ -38,3 +39,114 @@ def _editing_file(jsonfile, *,
 #    text = _dumps(data)
 #    # XXX Worry about races?
 #    _write_all(filename, text)
+
+
+##################################
+# selective loading
+
+WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+_DECODER = json.JSONDecoder()
+
+
+def load_fields(text, fields):
+    """Return a dict of the requested top-level fields of a JSON object.
+
+    Scanning stops as soon as every requested field has been found.  The
+    rest of the text is then only searched for later (top-level) copies
+    of those keys, so that the last one wins, as with json.loads().  It
+    is only decoded if a copy is found (or there are too many nested
+    matches to rule out).  A copy spelled with escape sequences, like
+    "\\u006eame", isn't noticed.
+    """
+    # Note that the fields we skip over do get decoded (and discarded).
+    # The C decoder does that faster than a pure-Python scan can skip.
+    wanted = set(fields)
+    result = {}
+    pos = _skip_ws(text, 0)
+    if text[pos:pos+1] != '{':
+        raise ValueError(f'expected JSON object at position {pos}')
+    pos = _skip_ws(text, pos + 1)
+    if text[pos:pos+1] == '}':
+        return result
+    for key, value, pos in _iter_members(text, pos):
+        if key in wanted or key in result:
+            result[key] = value
+            wanted.discard(key)
+        if not wanted:
+            break
+    else:
+        return result
+    if result:
+        for key, value in _find_duplicates(text, pos, result):
+            result[key] = value
+    return result
+
+
+# Checking a match costs roughly what decoding 1000 characters does.
+# We only check one match per this many characters (of the rest of the
+# text), so that giving up and decoding the rest costs little extra.
+CHECK_COST = 20_000
+
+
+def _find_duplicates(text, pos, keys):
+    # Only the keys themselves are searched for (which is cheap).  Each
+    # match is top-level only if the members parsed from there run to
+    # the end of the text; a nested one runs into its own closing "}"
+    # first.
+    pattern = '|'.join(re.escape(json.dumps(key, ensure_ascii=False)[1:-1])
+                       for key in keys)
+    regex = re.compile(f'"(?:{pattern})"[ \\t\\n\\r]*:')
+    budget = (len(text) - pos) // CHECK_COST
+    for match in regex.finditer(text, pos):
+        start = match.start()
+        if _is_escaped(text, start):
+            continue
+        budget -= 1
+        if budget < 0:
+            # There are too many matches to check one at a time.
+            members = _iter_members(text, pos)
+            return [(key, value) for key, value, _ in members if key in keys]
+        try:
+            members = list(_iter_members(text, start))
+        except ValueError:
+            continue
+        if _skip_ws(text, members[-1][2]) == len(text):
+            return [(key, value) for key, value, _ in members if key in keys]
+    return []
+
+
+def _iter_members(text, pos):
+    # Yield (key, value, pos) for each remaining member of an object,
+    # where pos is just past the following "," or "}".
+    while True:
+        key, pos = _DECODER.raw_decode(text, pos)
+        if not isinstance(key, str):
+            raise ValueError(f'expected key at position {pos}')
+        pos = _skip_ws(text, pos)
+        if text[pos:pos+1] != ':':
+            raise ValueError(f'expected ":" at position {pos}')
+        pos = _skip_ws(text, pos + 1)
+        value, pos = _DECODER.raw_decode(text, pos)
+        pos = _skip_ws(text, pos)
+        sep = text[pos:pos+1]
+        if sep == '}':
+            yield key, value, pos + 1
+            return
+        elif sep != ',':
+            raise ValueError(f'expected "," or "}}" at position {pos}')
+        pos = _skip_ws(text, pos + 1)
+        yield key, value, pos
+
+
+def _is_escaped(text, pos):
+    # The quote at pos is escaped if an odd number of backslashes
+    # precede it.
+    count = 0
+    while pos > count and text[pos - count - 1] == '\\':
+        count += 1
+    return count % 2 == 1
+
+
+def _skip_ws(text, pos):
+    return WHITESPACE_RE.match(text, pos).end()
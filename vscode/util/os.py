@@ -49,3 +49,104 @@ def write_all(filename, text, *,
     """Write the given text to the file."""
     with _open(filename, 'w') as outfile:
         return outfile.write(text)
+
+
+COPY_CHUNK = 1 << 20
+
+
+def files_match(source, target, *,
+                _stat=os.stat,
+                _open=open,
+                ):
+    """Return True if the two files have the same contents.
+
+    The cheap checks come first: the same inode (e.g. a hardlink) is a
+    match and a different size is not.  Otherwise the contents are
+    compared (a chunk at a time).
+    """
+    try:
+        tst = _stat(target)
+    except FileNotFoundError:
+        return False
+    sst = _stat(source)
+    if (sst.st_ino, sst.st_dev) == (tst.st_ino, tst.st_dev):
+        return True
+    if sst.st_size != tst.st_size:
+        return False
+    with _open(source, 'rb') as sfile, _open(target, 'rb') as tfile:
+        while True:
+            schunk = sfile.read(COPY_CHUNK)
+            if schunk != tfile.read(COPY_CHUNK):
+                return False
+            if not schunk:
+                return True
+
+
+def copy_file(source, target, *,
+              hardlink=False,
+              _link=os.link,
+              _replace=os.replace,
+              _open=open,
+              ):
+    """Copy the file's contents and mtime, and return how it was done.
+
+    With "hardlink", the target is linked to the source if possible
+    (so no bytes are copied at all).  Otherwise the copy happens in the
+    kernel (copy_file_range() or sendfile()) where supported, falling
+    back to a buffered copy.
+    """
+    if hardlink:
+        tmp = f'{target}.{os.getpid()}.tmp'
+        try:
+            _link(source, tmp)
+            _replace(tmp, target)
+            return 'hardlink'
+        except OSError:
+            # e.g. a different filesystem
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    with _open(source, 'rb') as infile, _open(target, 'wb') as outfile:
+        st = os.fstat(infile.fileno())
+        how = _copy_kernel(infile.fileno(), outfile.fileno(), st.st_size)
+        if how is None:
+            infile.seek(0)
+            outfile.seek(0)
+            outfile.truncate()
+            while True:
+                chunk = infile.read(COPY_CHUNK)
+                if not chunk:
+                    break
+                outfile.write(chunk)
+            how = 'buffered'
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return how
+
+
+def _copy_kernel(infd, outfd, size):
+    for how in ('copy_file_range', 'sendfile'):
+        copy = getattr(os, how, None)
+        if copy is None:
+            continue
+        if how == 'sendfile':
+            copy = (lambda i, o, n, _send=copy: _send(o, i, None, n))
+        copied = 0
+        try:
+            while copied < size:
+                sent = copy(infd, outfd, size - copied)
+                if not sent:
+                    break
+                copied += sent
+        except OSError:
+            # e.g. not supported for these files
+            if copied:
+                raise
+            continue
+        if copied == size:
+            return how
+        if copied:
+            # The file changed under us.  Let the buffered copy redo it.
+            return None
+    return None
@@ -0,0 +1,50 @@
+import concurrent.futures
+
+
+class ParallelError(Exception):
+    """Raised when one or more of the tasks run by run_all() failed.
+
+    "errors" is a list of (item, exception), in the order of the items
+    (not the order in which they failed).
+    """
+
+    def __init__(self, errors, total=None):
+        self.errors = list(errors)
+        self.total = total
+        lines = [f'{len(self.errors)} of {total or "?"} tasks failed:']
+        for item, exc in self.errors:
+            lines.append(f'  {item}: {type(exc).__name__}: {exc}')
+        super().__init__('\n'.join(lines))
+
+
+def run_all(func, items, *,
+            workers=None,
+            _new_pool=concurrent.futures.ThreadPoolExecutor,
+            ):
+    """Return [func(item) for item in items], using a thread pool.
+
+    The pool is bounded by "workers" (None means the executor default).
+    If "workers" is 1 then no pool is used.  Every item is run, even if
+    some fail, after which ParallelError is raised for the failures.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    errors = []
+    if workers == 1 or len(items) < 2:
+        for i, item in enumerate(items):
+            try:
+                results[i] = func(item)
+            except Exception as exc:
+                errors.append((i, exc))
+    else:
+        with _new_pool(workers) as pool:
+            futures = [pool.submit(func, item) for item in items]
+            for i, fut in enumerate(futures):
+                try:
+                    results[i] = fut.result()
+                except Exception as exc:
+                    errors.append((i, exc))
+    if errors:
+        raise ParallelError([(items[i], exc) for i, exc in errors],
+                            len(items))
+    return results
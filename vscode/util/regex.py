@@ -1,3 +1,4 @@
+import functools
 import re
 
 
@@ -7,8 +8,42 @@ def match(regex, text):
     The pattern must match exactly and is treated as verbose.
     """
     if isinstance(regex, str):
-        return re.match(rf'^{regex}$', text, re.VERBOSE)
-    else:
-        return regex.match(text)
+        regex = _compile_exact(regex)
+    return regex.match(text)
 
 
+@functools.lru_cache(maxsize=256)
+def _compile_exact(regex):
+    return re.compile(rf'^{regex}$', re.VERBOSE)
+
+
+def lazy_compile(pattern, flags=0):
+    """Return a regex that is only compiled when first used."""
+    return LazyPattern(pattern, flags)
+
+
+class LazyPattern:
+    """A wrapper around a pattern that compiles it on first use.
+
+    Any attribute of the compiled re.Pattern (e.g. match()) is
+    available directly.
+    """
+
+    __slots__ = ('pattern', 'flags', '_compiled')
+
+    def __init__(self, pattern, flags=0):
+        self.pattern = pattern
+        self.flags = flags
+        self._compiled = None
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.pattern!r}, {self.flags!r})'
+
+    def __getattr__(self, name):
+        return getattr(self.compile(), name)
+
+    def compile(self):
+        """Return the compiled re.Pattern."""
+        if self._compiled is None:
+            self._compiled = re.compile(self.pattern, self.flags)
+        return self._compiled
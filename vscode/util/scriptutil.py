@@ -95,11 +95,11 @@ def format_table(rows, cols, *, show_total=True, fit=True):
     total = 0
     if fit:
         widths = [w for w in cols.values()][:-1]
-        for total, row in enumerate(rows):
+        for total, row in enumerate(rows, 1):
             fixed = (str(v)[:w] for v, w in zip(row, widths))
             yield fmt.format(*fixed, *row[-1:])
     else:
-        for total, row in enumerate(rows):
+        for total, row in enumerate(rows, 1):
             yield fmt.format(*row)
     yield div
     if show_total:
@@ -1,26 +1,33 @@
+import re
+
+from .classtools import as_namedtuple
 from .net import EMAIL, URL
-from .regex import match
+from .regex import lazy_compile
+
+
+URL_RE = lazy_compile(rf'^{URL}$', re.VERBOSE)
+EMAIL_RE = lazy_compile(rf'^{EMAIL}$', re.VERBOSE)
 
 
 def validator(kind=None, options=None):
-    """Return a wrapper around validate()."""
+    """Return a wrapper around validate().
+
+    The kind (or options) is resolved once, here, rather than on every
+    call.
+    """
+    check = _resolve(kind, options)
     def wrapper(value):
-        return validate(value, kind=kind, options=options)
+        err = check(value)
+        if err:
+            raise ValueError(err)
+        return value
+    wrapper.spec = ('validator', kind, options)
     return wrapper
 
 
 def validate(value, name=None, *, kind=None, options=None):
     """Return the value after ensuring it is valid."""
-    if kind is None:
-        if options is None:
-            kind = 'nonempty'
-    elif options is not None:
-        raise ValueError('expected kind or options, got both')
-
-    if options:
-        err = _validate_by_options(value, options)
-    else:
-        err = _validate_by_kind(value, kind)
+    err = _resolve(kind, options)(value)
     if err:
         if name:
             err = f'({name}) {err}'
@@ -30,7 +37,7 @@ def validate(value, name=None, *, kind=None, options=None):
 
 def validate_sequence(items, name=None, *, kind=None, options=None):
     """Validate each item in the sequence."""
-    err = _validate_sequence(items, kind, options)
+    err = _check_sequence(items, _resolve(kind, options))
     if err:
         if name:
             err = f'({name}) {err}'
@@ -38,36 +45,104 @@ def validate_sequence(items, name=None, *, kind=None, options=None):
     return items
 
 
-def _validate_sequence(items, kind, options):
-    for item in items:
-        err = validate(item, kind=kind, options=options)
-        if err:
-            return err
-        if item is None:
-            return 'missing item'
+@as_namedtuple('path kind message')
+class Diagnostic:
+    """A single validation problem."""
+
+    __slots__ = ()
+
+    def __str__(self):
+        if self.path:
+            return f'({self.path}) {self.message}'
+        return self.message
+
+
+def iter_errors(value, name=None, *, kind=None, options=None):
+    """Yield a Diagnostic for every problem with the value.
+
+    Unlike validate(), this does not stop at the first problem.  For a
+    sequence kind (e.g. "[event]") each bad item is reported.
+    """
+    kind, options = _normalize(kind, options)
+    if (not options and isinstance(kind, str)
+            and kind.startswith('[') and kind.endswith(']')):
+        itemkind = kind[1:-1]
+        try:
+            items = iter(value)
+        except TypeError:
+            yield Diagnostic(name, kind, f'expected sequence, got {value!r}')
+            return
+        for i, item in enumerate(items):
+            path = f'{name or ""}[{i}]'
+            if item is None:
+                yield Diagnostic(path, itemkind, 'missing item')
+            else:
+                yield from iter_errors(item, path, kind=itemkind)
+        return
+
+    try:
+        err = _resolve(kind, options)(value)
+    except (TypeError, ValueError) as exc:
+        err = str(exc)
+    if err:
+        yield Diagnostic(name, _kind_name(kind, options), err)
+
+
+def _kind_name(kind, options):
+    if options:
+        return 'options'
+    elif isinstance(kind, str):
+        return kind
     else:
-        return None
+        return getattr(kind, '__name__', None) or repr(kind)
 
 
-def _validate_by_kind(value, kind):
-    if isinstance(kind, type):
-        if type(value) is not kind:
-            return f'expected {kind.__name__}, got {value!r}'
+def _normalize(kind, options):
+    if kind is None:
+        if options is None:
+            kind = 'nonempty'
+    elif options is not None:
+        raise ValueError('expected kind or options, got both')
+    return kind, options
 
-    elif callable(kind):
-        return kind(value)
 
+def _resolve(kind, options):
+    # Return a function that returns an error message (or None).
+    kind, options = _normalize(kind, options)
+    if options:
+        options = tuple(options)
+        return (lambda value: _validate_by_options(value, options))
+
+    if isinstance(kind, type):
+        def check(value):
+            if type(value) is not kind:
+                return f'expected {kind.__name__}, got {value!r}'
+        return check
+    elif callable(kind):
+        return kind
     elif not isinstance(kind, str):
         raise ValueError(f'unsupported kind {kind!r}')
     elif kind.startswith('[') and kind.endswith(']'):
-        kind = kind[1:-1]
-        return _validate_sequence(value, kind, ())
-    elif isinstance(value, str):
-        return _validate_string(value, kind)
+        check_item = _resolve(kind[1:-1], None)
+        return (lambda value: _check_sequence(value, check_item))
+    else:
+        check_string = _get_string_check(kind)
+        def check(value):
+            if isinstance(value, str):
+                return check_string(value)
+            elif value is not None:
+                return f'unsupported value {value!r}'
+            return None
+        return check
 
-    elif value is not None:
-        return f'unsupported value {value!r}'
 
+def _check_sequence(items, check_item):
+    for item in items:
+        if item is None:
+            return 'missing item'
+        err = check_item(item)
+        if err:
+            return err
     return None
 
 
@@ -92,47 +167,71 @@ def _validate_by_options(value, options):
             return f'expected one of several options, got {value!r}'
 
 
-def _validate_string(value, kind):
-    if kind == 'nonempty':
-        if not value:
-            return f'expected non-empty string, got {value!r}'
-
-    #elif not value:
-    #    return None
-    elif kind == 'identifier':
-        if not value.isidentifier():
-            return f'expected identifier, got {value!r}'
-    elif kind == 'filename':
-        # XXX Be more specific?
-        if not value:
-            return f'expected non-empty string, got {value!r}'
-    elif kind == 'uri':
-        if not match(URL, value):
-            return f'expected URL, got {value!r}'
-    elif kind == 'email':
-        if not match(EMAIL, value):
-            return f'expected email address, got {value!r}'
-    elif kind == 'license':
-        # XXX Be more specific?
-        if not value:
-            return f'expected non-empty string, got {value!r}'
-
-    # app-specific
-    elif kind == 'npm-script':
-        # XXX Be more specific?
-        if not value:
-            return f'expected non-empty string, got {value!r}'
-    elif kind == 'npm-module':
-        # XXX Be more specific?
-        if not value:
-            return f'expected non-empty string, got {value!r}'
-    elif kind == 'extension-id':
-        # XXX Be more specific?
-        if not value:
-            return f'expected non-empty string, got {value!r}'
-    elif kind == 'event':
-        # XXX Be more specific?
-        if not value:
-            return f'expected non-empty string, got {value!r}'
-    else:
+##################################
+# string kinds
+
+# {kind: check}, where check(value) returns an error message (or None)
+STRING_KINDS = {}
+
+
+def register_kind(kind, check=None):
+    """Register the function that validates strings of the given kind.
+
+    The function takes the string and returns an error message, or None
+    if it is valid.  This may be used as a decorator.
+    """
+    if check is None:
+        def decorator(check):
+            register_kind(kind, check)
+            return check
+        return decorator
+    if not kind or not isinstance(kind, str):
+        raise ValueError(f'expected non-empty str kind, got {kind!r}')
+    if kind in STRING_KINDS:
+        raise ValueError(f'kind {kind!r} already registered')
+    STRING_KINDS[kind] = check
+    return check
+
+
+def _get_string_check(kind):
+    try:
+        return STRING_KINDS[kind]
+    except KeyError:
         raise ValueError(f'unsupported kind {kind!r}')
+
+
+def _check_nonempty(value):
+    if not value:
+        return f'expected non-empty string, got {value!r}'
+
+
+def _check_identifier(value):
+    if not value.isidentifier():
+        return f'expected identifier, got {value!r}'
+
+
+def _check_uri(value):
+    if not URL_RE.match(value):
+        return f'expected URL, got {value!r}'
+
+
+def _check_email(value):
+    if not EMAIL_RE.match(value):
+        return f'expected email address, got {value!r}'
+
+
+register_kind('nonempty', _check_nonempty)
+register_kind('identifier', _check_identifier)
+# XXX Be more specific?
+register_kind('filename', _check_nonempty)
+register_kind('uri', _check_uri)
+register_kind('email', _check_email)
+# XXX Be more specific?
+register_kind('license', _check_nonempty)
+
+# app-specific
+# XXX Be more specific (for all of these)?
+register_kind('npm-script', _check_nonempty)
+register_kind('npm-module', _check_nonempty)
+register_kind('extension-id', _check_nonempty)
+register_kind('event', _check_nonempty)
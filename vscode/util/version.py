@@ -1,7 +1,9 @@
+import functools
 import re
 
 from .classtools import as_namedtuple, Slot
 from .coercion import as_str, as_int, as_sequence
+from .regex import lazy_compile
 
 
 # common
@@ -20,7 +22,7 @@ SIMPLE = rf'''
           ( {NUMBER} )  # micro
           )
         '''
-SIMPLE_RE = re.compile(rf'''^
+SIMPLE_RE = lazy_compile(rf'''^
         \s*
         {SIMPLE}
         ( .* )  # remainder
@@ -39,7 +41,7 @@ SEMVER_IDENTIFIER = rf'''
           [a-zA-Z] {SEMVER_CHAR}* [a-zA-Z0-9]
           )
         '''
-SEMVER_RE = re.compile(rf'''^
+SEMVER_RE = lazy_compile(rf'''^
         \s*
         {SIMPLE}
         ( [-]
@@ -84,7 +86,7 @@ R_SIMPLE = rf'''
           {R_PARTIAL}
           )
         '''
-SELECTOR_RE = re.compile(rf'''^
+SELECTOR_RE = lazy_compile(rf'''^
         # R_SIMPLE
         ( [<=>~^] | >= | <= )?
         ( {R_NUM} )
@@ -106,7 +108,8 @@ RANGE = rf'''
           ( {R_SIMPLE} (?: \s+ {R_SIMPLE} )* )
           )
         '''
-RANGE_RE = re.compile(rf'^{RANGE}$', re.VERBOSE)
+RANGE_RE = lazy_compile(rf'^{RANGE}$', re.VERBOSE)
+HYPHEN_RE = lazy_compile(r'\s+-\s+')
 
 
 def parse(text):
@@ -132,9 +135,9 @@ def parse_spec_version(text):
         raise ValueError(f'expected version selector, got {text!r}')
     op, major, minor, micro, qualifier = m.groups()
     if qualifier:
-        labels, metadata = qualifier.partition('+')
+        labels, _, metadata = qualifier.partition('+')
         labels = tuple(labels[1:].split('.')) if labels else ()
-        metadata = tuple(metadata[1:].split('.')) if metadata else ()
+        metadata = tuple(metadata.split('.')) if metadata else ()
     else:
         labels = metadata = None
     return op or None, major, minor, micro, labels, metadata
@@ -149,13 +152,14 @@ def normalize_spec_version(version):
 def parse_spec(text):
     """Return [range] for the given text.
 
-    "range" is (min, max), ((op, ver),) or ((op, ver), (op, ver)).
+    "range" is ((op, ver),) or ((op, ver), (op, ver)).  Hyphen ranges
+    ("A - B") are returned as ((">=", A), ("<=", B)).
     """
     spec = []
     for raw in text.split('||'):
         raw = raw .strip()
         if not raw:
-            spec.append('*')
+            spec.append(((None, '*', None, None, None, None),))
             continue
         m = RANGE_RE.match(raw)
         if not m:
@@ -163,9 +167,11 @@ def parse_spec(text):
         hyphen, simple = m.groups()
         if hyphen:
             vrange = tuple(parse_spec_version(v.strip())
-                           for v in hyphen.split('-'))
+                           for v in HYPHEN_RE.split(hyphen))
             if len(vrange) != 2:
                 raise ValueError(f'bad range {raw!r}')
+            (_, *lower), (_, *upper) = vrange
+            vrange = (('>=', *lower), ('<=', *upper))
         else:
             vrange = tuple(parse_spec_version(v.strip())
                            for v in simple.split())
@@ -176,9 +182,198 @@ def parse_spec(text):
 
 
 def normalize_spec(spec):
-    """Return the spec with all ranges normalized."""
-    # XXX finish!
-    return spec
+    """Return the spec with all ranges normalized.
+
+    The result is a sorted tuple of non-overlapping VersionRange.
+    An empty tuple means no version matches.
+    """
+    ranges = []
+    for vrange in spec:
+        lower, upper = ANY
+        for version in vrange:
+            lo, hi = _selector_bounds(*version)
+            lower = max(lower, lo, key=_lower_key)
+            upper = min(upper, hi, key=_upper_key)
+        ranges.append(VersionRange(lower, upper))
+    return _merge_ranges(ranges)
+
+
+##################################
+# range algebra
+
+# A bound is (op, key), where "key" is a comparable version key (see
+# version_key()).  A lower bound always has a key (MIN_KEY at least).
+# An upper bound of None means there is no upper limit.
+
+def version_key(major, minor, micro, labels=None):
+    """Return a key for the version that sorts in SemVer precedence."""
+    if not labels:
+        return (major, minor, micro, 1, ())
+    labels = tuple((0, int(l)) if l.isdigit() else (1, l)
+                   for l in labels)
+    return (major, minor, micro, 0, labels)
+
+
+def format_version_key(key):
+    """Return the version string corresponding to the given key."""
+    major, minor, micro, final, labels = key
+    text = f'{major}.{minor}.{micro}'
+    if not final:
+        text += '-' + '.'.join(str(l) for _, l in labels)
+    return text
+
+
+# "-0" is the lowest possible pre-release label.
+MIN_KEY = version_key(0, 0, 0, ['0'])
+ANY = (('>=', MIN_KEY), None)
+
+
+def _pre(major, minor, micro):
+    # The lowest version with the given numbers (i.e. "X.Y.Z-0").
+    return version_key(major, minor, micro, ['0'])
+
+
+def _selector_bounds(op, major, minor, micro, labels=None, metadata=None):
+    # Metadata never affects precedence.
+    nums = []
+    for num in (major, minor, micro):
+        if num is None or num in ('x', 'X', '*'):
+            break
+        nums.append(int(num))
+    if len(nums) < 3:
+        labels = None
+
+    if not nums:
+        if op in ('<', '>'):
+            return ('>=', MIN_KEY), ('<', MIN_KEY)  # nothing
+        return ANY
+    if len(nums) == 3:
+        key = version_key(*nums, labels)
+        if op == '>':
+            return ('>', key), None
+        elif op == '>=':
+            return ('>=', key), None
+        elif op == '<':
+            return ('>=', MIN_KEY), ('<', key)
+        elif op == '<=':
+            return ('>=', MIN_KEY), ('<=', key)
+        elif op == '~':
+            return ('>=', key), ('<', _pre(nums[0], nums[1] + 1, 0))
+        elif op == '^':
+            major, minor, micro = nums
+            if major:
+                upper = _pre(major + 1, 0, 0)
+            elif minor:
+                upper = _pre(0, minor + 1, 0)
+            else:
+                upper = _pre(0, 0, micro + 1)
+            return ('>=', key), ('<', upper)
+        else:
+            return ('>=', key), ('<=', key)
+
+    # It is a partial version (X or X.Y).
+    low = version_key(*nums, *[0] * (3 - len(nums)))
+    if len(nums) == 1 or (op == '^' and nums[0]):
+        high = _pre(nums[0] + 1, 0, 0)
+    else:
+        high = _pre(nums[0], nums[1] + 1, 0)
+    if op == '>':
+        return ('>=', high), None
+    elif op == '>=':
+        return ('>=', low), None
+    elif op == '<':
+        return ('>=', MIN_KEY), ('<', _pre(*low[:3]))
+    elif op == '<=':
+        return ('>=', MIN_KEY), ('<', high)
+    else:
+        return ('>=', low), ('<', high)
+
+
+def _lower_key(bound):
+    op, key = bound
+    return (key, op == '>')
+
+
+def _upper_key(bound):
+    if bound is None:
+        return (1,)
+    op, key = bound
+    return (0, key, op == '<=')
+
+
+def _is_empty(lower, upper):
+    if upper is None:
+        return False
+    (loop, lokey), (hiop, hikey) = lower, upper
+    if lokey != hikey:
+        return lokey > hikey
+    return loop != '>=' or hiop != '<='
+
+
+def _touches(upper, lower):
+    # Return True if there is no gap between the two bounds.
+    if upper is None:
+        return True
+    (hiop, hikey), (loop, lokey) = upper, lower
+    if hikey != lokey:
+        return hikey > lokey
+    return hiop == '<=' or loop == '>='
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for lower, upper in sorted(ranges, key=(lambda r: _lower_key(r[0]))):
+        if _is_empty(lower, upper):
+            continue
+        if merged and _touches(merged[-1].max, lower):
+            last = merged[-1]
+            upper = max(last.max, upper, key=_upper_key)
+            merged[-1] = VersionRange(last.min, upper)
+        else:
+            merged.append(VersionRange(lower, upper))
+    return tuple(merged)
+
+
+def _format_ranges(ranges):
+    if not ranges:
+        return '<0.0.0-0'
+    parts = []
+    for (loop, lokey), upper in ranges:
+        if upper is not None and upper[1] == lokey:
+            # It is a single version.
+            parts.append(format_version_key(lokey))
+            continue
+        comparators = []
+        if lokey != MIN_KEY or loop != '>=':
+            comparators.append(loop + format_version_key(lokey))
+        if upper is not None:
+            hiop, hikey = upper
+            comparators.append(hiop + format_version_key(hikey))
+        parts.append(' '.join(comparators) or '*')
+    return ' || '.join(parts)
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_ranges(text):
+    return normalize_spec(parse_spec(text))
+
+
+@functools.lru_cache(maxsize=1024)
+def _intersect(text1, text2):
+    ranges = []
+    for lower1, upper1 in _parse_ranges(text1):
+        for lower2, upper2 in _parse_ranges(text2):
+            ranges.append((
+                max(lower1, lower2, key=_lower_key),
+                min(upper1, upper2, key=_upper_key),
+                ))
+    return _format_ranges(_merge_ranges(ranges))
+
+
+@functools.lru_cache(maxsize=1024)
+def _union(text1, text2):
+    ranges = _parse_ranges(text1) + _parse_ranges(text2)
+    return _format_ranges(_merge_ranges(ranges))
 
 
 @as_namedtuple('major minor micro')
@@ -198,6 +393,12 @@ class _Base:
         self.validate()
         return self
 
+    _COLUMN_KINDS = {
+            'major': as_int,
+            'minor': as_int,
+            'micro': as_int,
+            }
+
     @classmethod
     def _parse(cls, text):
         raise NotImplementedError
@@ -219,7 +420,7 @@ class _Base:
             return self._raw
 
     def _as_str(self):
-        return '.'.join(self)
+        return '.'.join(str(v) for v in self)
 
     @property
     def patch(self):
@@ -254,7 +455,7 @@ class Version(_Base):
 
     #__slots__ = ('_labels',)
     __slots__ = ()
-    _labels = Slot()
+    _labels = Slot(None)
 
     @classmethod
     def _parse(cls, text):
@@ -341,7 +542,7 @@ class SemVer(Version):
 
     #__slots__ = ('_metadata',)
     __slots__ = ()
-    _metadata = Slot()
+    _metadata = Slot(None)
 
     @classmethod
     def _parse(cls, text):
@@ -447,7 +648,10 @@ class SpecVersion:
 
 @as_namedtuple('min max')
 class VersionRange:
-    """A range of versions."""
+    """A range of versions.
+
+    "min" is a lower bound and "max" an upper bound (or None).
+    """
 
 
 class VersionSpec(str):
@@ -466,20 +670,43 @@ class VersionSpec(str):
         """
         text = text.strip()
         self = cls(text)
-        spec = parse_spec(text)
-        self._ranges = normalize_spec(spec)
+        self._ranges = _parse_ranges(text)
         self.validate()
         return self
 
     @property
     def ranges(self):
+        """The normalized ranges (a sorted tuple of VersionRange)."""
         try:
             return self._ranges
         except AttributeError:
-            spec = parse_spec(self)
-            self._ranges = normalize_spec(spec)
+            self._ranges = _parse_ranges(self.strip())
             return self._ranges
 
+    @property
+    def is_empty(self):
+        return not self.ranges
+
+    def intersect(self, *others):
+        """Return a spec matching only versions all the specs match."""
+        text = self.strip()
+        for other in others:
+            text = _intersect(text, str(other).strip())
+        return type(self).parse(text)
+
+    def union(self, *others):
+        """Return a spec matching versions any of the specs match."""
+        text = self.strip()
+        for other in others:
+            text = _union(text, str(other).strip())
+        return type(self).parse(text)
+
+    def is_subset(self, other):
+        """Return True if every matching version also matches "other"."""
+        other = str(other).strip()
+        return _union(self.strip(), other) == _format_ranges(
+                _parse_ranges(other))
+
     def validate(self):
         # XXX finish!
         return